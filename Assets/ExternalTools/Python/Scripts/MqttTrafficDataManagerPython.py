@@ -1,14 +1,32 @@
 import requests
 import paho.mqtt.client as mqtt
+from paho.mqtt.packettypes import PacketTypes
+from paho.mqtt.properties import Properties
 import json
+import orjson
 import time
 import logging
 import threading
 import ssl
-import csv
+import socket
 import os
+import mmap
+import re
 import random
+import signal
+import tempfile
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse
+from requests.adapters import HTTPAdapter
 from urllib3.exceptions import InsecureRequestWarning
+from urllib3.util.retry import Retry
+
+try:
+    import zstandard as zstd
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
 
 # Suppress only the specific InsecureRequestWarning
 requests.packages.urllib3.disable_warnings(InsecureRequestWarning)
@@ -30,7 +48,13 @@ class AircraftDataBridge:
         self.mqtt_password = "Tang123"
         
         # MQTT Topics
+        # Consumers can scale out deltas with an MQTT v5 shared subscription,
+        # e.g. "$share/<group>/aircraft/traffic/delta": the broker then hands
+        # each message to one member of the group instead of every subscriber.
         self.aircraft_data_topic = "aircraft/traffic"
+        self.aircraft_delta_topic = f"{self.aircraft_data_topic}/delta"
+        self.aircraft_full_topic = f"{self.aircraft_data_topic}/full"
+        self.aircraft_compressed_topic = f"{self.aircraft_data_topic}.zst"
         self.request_topic = "aircraft/request"
         
         # MQTT Settings
@@ -45,12 +69,29 @@ class AircraftDataBridge:
         # Publisher settings
         self.publish_interval_sec = 5  # periodic publish interval
         self.enable_periodic_publishing = False  # on-demand by default
+        self.fetch_coalesce_sec = 0.2  # update requests within this window share one fetch
+        self.full_snapshot_interval_sec = 60  # retained full snapshot cadence for late joiners
+        self.full_snapshot_expiry_sec = 120  # broker drops the retained snapshot once it is this stale
+        self.publish_legacy_snapshot = True  # uncompressed full snapshots on aircraft/traffic; Unity's MqttTrafficDataManager reads these
+        self.publish_compressed_snapshot = ZSTD_AVAILABLE  # zstd full snapshots on aircraft/traffic.zst (not alongside legacy)
 
         # Connection state
         self.is_connected = False
         self.mqtt_client = None
         self.stop_event = threading.Event()
         self.publisher_thread = None
+        self._pending_fetches = 0
+        self._fetch_timer = None
+        self._fetch_lock = threading.Lock()
+        
+        # Delta publishing state: icao24 -> last published state vector
+        self._last_states = {}
+        self._last_full_publish = float("-inf")
+        self._publish_lock = threading.Lock()
+        # Level 3 compresses JSON at hundreds of MB/s; the repeated keys and
+        # country strings shrink several-fold. Subscribers decode with
+        # zstd.ZstdDecompressor().decompress(msg.payload)
+        self._zctx = zstd.ZstdCompressor(level=3, threads=-1) if ZSTD_AVAILABLE else None
         
         # Proxy configuration
         self.use_proxy = True
@@ -58,12 +99,31 @@ class AircraftDataBridge:
         self.proxy_list = []
         self.current_proxy = None
         self.proxy_failures = {}
+        self.proxy_failures_lock = threading.Lock()
+        self.proxy_test_workers = 64  # also bounds concurrent probe sockets
+        self.proxy_connect_timeout = 1.5  # TCP pre-check; dead proxies usually fail here fast
+        self.proxy_probe_timeout = 3  # full GET through a proxy that accepted the connection
+        self.proxy_failure_ttl_sec = 3600  # failures older than this no longer blacklist a proxy
+        self.proxy_rtt_alpha = 0.3  # EWMA weight of the newest probe round-trip time
+        
+        # Shared HTTP sessions and probe pool, reused across API fetches and
+        # proxy probes so neither pays per-call socket or thread setup.
+        # Probes get no retries: a dead proxy should fail once, not four times.
+        self.http = self.create_http_session(
+            Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504]))
+        self.probe_http = self.create_http_session(0)
+        self.proxy_test_executor = ThreadPoolExecutor(max_workers=self.proxy_test_workers,
+                                                      thread_name_prefix="proxy-probe")
         
         # Load proxies from CSV file
         script_dir = os.path.dirname(os.path.abspath(__file__))
         csv_path = os.path.join(script_dir, "data.csv")
         self.load_proxies_from_csv(csv_path)
         
+        # Proxy health persisted across restarts so dead proxies aren't re-probed cold
+        self.proxy_state_path = os.path.join(script_dir, ".proxy_state.json")
+        self.proxy_state = self.load_proxy_state(self.proxy_state_path)
+        
         # Get a working proxy
         if self.use_proxy and self.proxy_list:
             self.current_proxy = self.find_working_proxy()
@@ -80,64 +140,181 @@ class AircraftDataBridge:
         # Initialize MQTT client
         self.initialize_mqtt_client()
     
+    def create_http_session(self, max_retries):
+        """Create a pooled HTTP session with the given urllib3 retry policy"""
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=64, max_retries=max_retries)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.verify = False
+        return session
+    
     def load_proxies_from_csv(self, csv_file_path):
         """Load proxies from CSV file"""
         try:
             if os.path.exists(csv_file_path):
-                with open(csv_file_path, 'r') as file:
-                    csv_reader = csv.reader(file)
-                    for row in csv_reader:
-                        if row and len(row) > 0 and row[0].startswith('socks4://'):
-                            self.proxy_list.append(row[0])
+                with open(csv_file_path, 'rb') as file:
+                    if os.fstat(file.fileno()).st_size:
+                        # One regex pass over the mapped file: first-column socks4 URLs only
+                        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                            found = re.findall(rb'(?m)^socks4://[^\s,]+', mm)
+                        # Free lists repeat entries; drop exact duplicates, keeping order
+                        self.proxy_list.extend(dict.fromkeys(m.decode() for m in found))
                 logger.info(f"Loaded {len(self.proxy_list)} proxies from CSV file")
             else:
                 logger.error(f"Proxy CSV file not found: {csv_file_path}")
         except Exception as e:
             logger.error(f"Error loading proxies from CSV: {e}")
     
+    def load_proxy_state(self, state_path):
+        """Load persisted proxy health and seed failure counts that are still within the TTL"""
+        try:
+            with open(state_path, 'r') as file:
+                state = json.load(file)
+        except (OSError, ValueError):
+            return {}
+        
+        now = time.time()
+        for proxy, entry in state.items():
+            last_fail_ts = entry.get('last_fail_ts') or 0
+            if now - last_fail_ts < self.proxy_failure_ttl_sec:
+                self.proxy_failures[proxy] = entry.get('failures', 0)
+            else:
+                entry['failures'] = 0
+        logger.info(f"Loaded health state for {len(state)} proxies")
+        return state
+    
+    def save_proxy_state(self):
+        """Atomically write proxy health to disk; only the serialization holds proxy_failures_lock"""
+        with self.proxy_failures_lock:
+            snapshot = json.dumps(self.proxy_state)
+        try:
+            state_dir = os.path.dirname(self.proxy_state_path)
+            with tempfile.NamedTemporaryFile('w', dir=state_dir, suffix='.tmp', delete=False) as file:
+                file.write(snapshot)
+            os.replace(file.name, self.proxy_state_path)
+        except OSError as e:
+            logger.debug(f"Could not save proxy state: {e}")
+    
+    def active_proxy_failures(self, proxy, now):
+        """Failure count for a proxy, forgetting failures older than the TTL; caller must hold proxy_failures_lock"""
+        failures = self.proxy_failures.get(proxy, 0)
+        if failures:
+            entry = self.proxy_state.get(proxy, {})
+            if now - (entry.get('last_fail_ts') or 0) >= self.proxy_failure_ttl_sec:
+                failures = self.proxy_failures[proxy] = 0
+                if entry:
+                    entry['failures'] = 0
+        return failures
+    
     def test_proxy(self, proxy):
         """Test if a proxy is working"""
-        if proxy in self.proxy_failures and self.proxy_failures[proxy] >= 3:
-            return False
+        with self.proxy_failures_lock:
+            if self.active_proxy_failures(proxy, time.time()) >= 3:
+                return False
             
         try:
+            # Cheap TCP connect first so dead hosts don't cost a full HTTPS timeout
+            parsed = urlparse(proxy)
+            if not self.tcp_connect_ok(parsed.hostname, parsed.port or 1080, self.proxy_connect_timeout):
+                self.record_proxy_failure(proxy)
+                logger.debug(f"Proxy {proxy} refused TCP connection")
+                return False
+            
             test_proxies = {
                 "http": proxy,
                 "https": proxy,
             }
-            response = requests.get("https://opensky-network.org/api/states/all", 
-                                  proxies=test_proxies, 
-                                  timeout=5, 
-                                  verify=False)
-            return response.status_code == 200
+            start = time.perf_counter()
+            response = self.probe_http.get("https://opensky-network.org/api/states/all", 
+                                           proxies=test_proxies, 
+                                           timeout=self.proxy_probe_timeout)
+            if response.status_code == 200:
+                self.record_proxy_success(proxy, time.perf_counter() - start)
+                return True
+            return False
         except Exception as e:
-            if proxy not in self.proxy_failures:
-                self.proxy_failures[proxy] = 1
-            else:
-                self.proxy_failures[proxy] += 1
+            self.record_proxy_failure(proxy)
             logger.debug(f"Proxy {proxy} test failed: {e}")
             return False
+
+    @staticmethod
+    def tcp_connect_ok(host, port, timeout):
+        """Return True if a TCP connection to host:port opens within timeout seconds"""
+        if not host:
+            return False
+        try:
+            with socket.create_connection((host, port), timeout=timeout):
+                return True
+        except OSError:
+            return False
+
+    def record_proxy_success(self, proxy, rtt):
+        """Record a successful probe and fold its round-trip time into the proxy's EWMA"""
+        with self.proxy_failures_lock:
+            # A proxy that answers again starts over with a clean record
+            self.proxy_failures[proxy] = 0
+            entry = self.proxy_state.setdefault(proxy, {'failures': 0})
+            entry['failures'] = 0
+            avg_rtt = entry.get('avg_rtt')
+            if avg_rtt is None:
+                entry['avg_rtt'] = rtt
+            else:
+                entry['avg_rtt'] = self.proxy_rtt_alpha * rtt + (1 - self.proxy_rtt_alpha) * avg_rtt
+            entry['last_ok_ts'] = time.time()
+
+    def record_proxy_failure(self, proxy):
+        """Increment the failure count for a proxy (safe to call from probe threads)"""
+        with self.proxy_failures_lock:
+            self.proxy_failures[proxy] = self.proxy_failures.get(proxy, 0) + 1
+            entry = self.proxy_state.setdefault(proxy, {'failures': 0})
+            entry['failures'] = self.proxy_failures[proxy]
+            entry['last_fail_ts'] = time.time()
     
     def find_working_proxy(self):
         """Find a working proxy from the list"""
         if not self.proxy_list:
             return None
             
-        # Make a copy and shuffle to try proxies in random order
+        # Shuffle, then stable-sort so the most recently working proxies are probed
+        # first (faster ones breaking ties), blacklisted ones last, and proxies
+        # without history keep a random order among themselves
         test_proxies = self.proxy_list.copy()
         random.shuffle(test_proxies)
+        now = time.time()
+        with self.proxy_failures_lock:
+            def proxy_rank(proxy):
+                entry = self.proxy_state.get(proxy, {})
+                return (self.active_proxy_failures(proxy, now) >= 3,
+                        -(entry.get('last_ok_ts') or 0),
+                        entry.get('avg_rtt') or 1e9)
+            test_proxies.sort(key=proxy_rank)
         
-        for proxy in test_proxies:
-            logger.debug(f"Testing proxy: {proxy}")
-            if self.test_proxy(proxy):
-                logger.info(f"Found working proxy: {proxy}")
-                return proxy
+        # Probe proxies concurrently and take the first one that answers;
+        # the probes are I/O bound so threads scale with the pool size
+        futures = {self.proxy_test_executor.submit(self.test_proxy, proxy): proxy for proxy in test_proxies}
+        try:
+            for future in as_completed(futures):
+                if future.result():
+                    proxy = futures[future]
+                    logger.info(f"Found working proxy: {proxy}")
+                    return proxy
+        finally:
+            # Drop queued probes once we have an answer; in-flight ones time out on their own
+            for future in futures:
+                future.cancel()
+            # Persist the sweep's results once rather than after every probe
+            self.save_proxy_state()
         
         return None
     
     def initialize_mqtt_client(self):
         """Initialize the MQTT client with appropriate callbacks"""
-        self.mqtt_client = mqtt.Client(client_id=self.client_id, clean_session=self.clean_session)
+        # MQTT v5 for message expiry on the retained snapshot; clean_session
+        # becomes clean_start at connect time under v5
+        self.mqtt_client = mqtt.Client(client_id=self.client_id, protocol=mqtt.MQTTv5)
+        self.full_snapshot_properties = Properties(PacketTypes.PUBLISH)
+        self.full_snapshot_properties.MessageExpiryInterval = self.full_snapshot_expiry_sec
         
         # Set up authentication if provided
         if self.mqtt_username and self.mqtt_password:
@@ -155,7 +332,7 @@ class AircraftDataBridge:
         """Connect to the MQTT broker"""
         try:
             logger.info(f"Connecting to MQTT broker at {self.broker_address}:{self.broker_port}")
-            self.mqtt_client.connect(self.broker_address, self.broker_port)
+            self.mqtt_client.connect(self.broker_address, self.broker_port, clean_start=self.clean_session)
             self.mqtt_client.loop_start()
             return True
         except Exception as e:
@@ -165,12 +342,19 @@ class AircraftDataBridge:
     def disconnect(self):
         """Disconnect from the MQTT broker"""
         self.stop_event.set()
+        with self._fetch_lock:
+            if self._fetch_timer is not None:
+                self._fetch_timer.cancel()
         if self.mqtt_client:
             self.mqtt_client.loop_stop()
             self.mqtt_client.disconnect()
             logger.info("Disconnected from MQTT broker")
+        self.proxy_test_executor.shutdown(wait=False, cancel_futures=True)
+        self.save_proxy_state()
+        self.http.close()
+        self.probe_http.close()
     
-    def on_connect(self, client, userdata, flags, rc):
+    def on_connect(self, client, userdata, flags, rc, properties=None):
         """Callback when connected to the MQTT broker"""
         if rc == 0:
             self.is_connected = True
@@ -187,7 +371,7 @@ class AircraftDataBridge:
         else:
             logger.error(f"Failed to connect to MQTT broker with result code {rc}")
     
-    def on_disconnect(self, client, userdata, rc):
+    def on_disconnect(self, client, userdata, rc, properties=None):
         """Callback when disconnected from the MQTT broker"""
         self.is_connected = False
         if rc != 0:
@@ -198,127 +382,211 @@ class AircraftDataBridge:
     def on_message(self, client, userdata, msg):
         """Callback when message is received - updates are only triggered by messages"""
         try:
-            payload = msg.payload.decode()
+            raw = msg.payload
             topic = msg.topic
             
             logger.info(f"Message received on topic {topic}")
             
             if topic == self.request_topic:
-                # Process request for data update
-                try:
-                    request_data = json.loads(payload)
+                # Process request for data update; only payloads that look like
+                # JSON by their first byte are parsed, and ones that fail to
+                # parse are still handled as plain text
+                request_data = None
+                if raw.lstrip()[:1] in (b'{', b'['):
+                    try:
+                        request_data = orjson.loads(raw)
+                    except orjson.JSONDecodeError:
+                        pass
+                if request_data is not None:
+                    if not isinstance(request_data, dict):
+                        logger.info(f"Ignoring non-object request: {request_data}")
+                        return
                     # Store last request parameters to refine subsequent fetches
                     self.last_request_params = request_data
                     if request_data.get("command") == "update":
                         logger.info("Data update requested, fetching fresh data...")
-                        self.fetch_and_publish_data()
+                        self.schedule_fetch()
                     else:
                         logger.info(f"Received command: {request_data.get('command', 'unknown')}")
-                except json.JSONDecodeError:
+                else:
                     # Handle plain text messages
-                    if payload.strip().lower() == "update":
+                    text = raw.decode('utf-8', 'ignore').strip()
+                    if text.lower() == "update":
                         logger.info("Data update requested via plain text, fetching fresh data...")
-                        self.fetch_and_publish_data()
+                        self.schedule_fetch()
                     else:
-                        logger.info(f"Received message: {payload}")
+                        logger.info(f"Received message: {text}")
         except Exception as e:
             logger.error(f"Error processing message: {e}")
     
+    def schedule_fetch(self):
+        """Schedule a fetch, coalescing update requests that arrive within a short window"""
+        with self._fetch_lock:
+            self._pending_fetches += 1
+            # Triggers ride along with a pending timer rather than restarting it,
+            # so a steady stream of updates can't postpone the fetch forever
+            if self._fetch_timer is not None:
+                return
+            self._fetch_timer = threading.Timer(self.fetch_coalesce_sec, self._flush_fetches)
+            self._fetch_timer.daemon = True
+            self._fetch_timer.start()
+    
+    def _flush_fetches(self):
+        """Run one fetch on behalf of every update request queued by schedule_fetch"""
+        with self._fetch_lock:
+            pending = self._pending_fetches
+            self._pending_fetches = 0
+            self._fetch_timer = None
+        if pending > 1:
+            logger.info("Coalesced %d update requests into one fetch", pending)
+        self.fetch_and_publish_data()
+    
     def fetch_and_publish_data(self):
         """Fetch data from Airplanes.live (preferred) or OpenSky API and publish to MQTT"""
-        max_retries = 3
-        retry_count = 0
-        
-        while retry_count < max_retries:
-            try:
-                request_params = getattr(self, 'last_request_params', None)
+        # Transient errors are retried with backoff by the session's adapter;
+        # a failure that survives those retries rotates to another proxy
+        try:
+            request_params = getattr(self, 'last_request_params', None)
 
-                # Try Airplanes.live point endpoint first if we have a center
-                response = None
-                if request_params and 'center_lat' in request_params and 'center_lon' in request_params:
-                    lat = request_params.get('center_lat')
-                    lon = request_params.get('center_lon')
-                    radius_km = float(request_params.get('radius_km', 250))
-                    radius_m = int(max(10000, min(400000, radius_km * 1000)))
-                    url = f"{self.api_url_airplanes_live}?lat={lat}&lon={lon}&dist={radius_m}"
-                    logger.info(f"Fetching Airplanes.live data near ({lat},{lon}) r={radius_m}m")
-                    try:
-                        response = requests.get(url, timeout=10)
-                        if response.status_code != 200:
-                            response = None
-                    except Exception as e:
-                        logger.debug(f"Airplanes.live request failed: {e}")
+            # Try Airplanes.live point endpoint first if we have a center
+            response = None
+            if request_params and 'center_lat' in request_params and 'center_lon' in request_params:
+                lat = request_params.get('center_lat')
+                lon = request_params.get('center_lon')
+                radius_km = float(request_params.get('radius_km', 250))
+                radius_m = int(max(10000, min(400000, radius_km * 1000)))
+                url = f"{self.api_url_airplanes_live}?lat={lat}&lon={lon}&dist={radius_m}"
+                logger.info(f"Fetching Airplanes.live data near ({lat},{lon}) r={radius_m}m")
+                try:
+                    response = self.http.get(url, timeout=10)
+                    if response.status_code != 200:
+                        response = None
+                except Exception as e:
+                    logger.debug(f"Airplanes.live request failed: {e}")
 
-                # Fallback to OpenSky global states
-                if response is None:
-                    url = self.api_url_opensky
-                    logger.info("Fetching OpenSky global data")
-                    if self.use_proxy and self.current_proxy:
-                        response = requests.get(url, proxies=self.proxies, timeout=10, verify=False)
-                    else:
-                        response = requests.get(url, timeout=10)
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    # Normalize Airplanes.live response to OpenSky-like schema if needed
-                    if 'ac' in data and isinstance(data['ac'], list):
-                        states = []
-                        for ac in data['ac']:
-                            icao24 = ac.get('icao') or ac.get('hex') or ''
-                            callsign = ac.get('call') or ''
-                            origin_country = ''
-                            lon = ac.get('lon') or 0
-                            lat = ac.get('lat') or 0
-                            alt_baro = ac.get('alt_baro') or ac.get('alt_baro_ft')
-                            if alt_baro is None:
-                                alt_baro = 0
-                            vel = ac.get('gs') or 0
-                            track = ac.get('track') or 0
-                            vr = ac.get('roc') or 0
-                            on_ground = bool(ac.get('gnd'))
-                            state = [
-                                icao24,
-                                callsign,
-                                origin_country,
-                                None, None,
-                                lon,
-                                lat,
-                                alt_baro,
-                                on_ground,
-                                vel,
-                                track,
-                                vr,
-                            ] + [None] * 5
-                            states.append(state)
-                        data = { 'time': int(time.time()), 'states': states }
-                    logger.info(f"Successfully fetched data with {len(data.get('states', []))} aircraft")
-                    
-                    # Publish the data to the MQTT topic
-                    self.mqtt_client.publish(self.aircraft_data_topic, json.dumps(data))
-                    logger.info(f"Published aircraft data to {self.aircraft_data_topic}")
-                    return
+            # Fallback to OpenSky global states
+            if response is None:
+                url = self.api_url_opensky
+                logger.info("Fetching OpenSky global data")
+                if self.use_proxy and self.current_proxy:
+                    response = self.http.get(url, proxies=self.proxies, timeout=10)
                 else:
-                    logger.error(f"API request failed with status code: {response.status_code}")
-                    retry_count += 1
-                    # Try another proxy
-                    self.switch_proxy()
+                    response = self.http.get(url, timeout=10)
             
-            except Exception as e:
-                logger.error(f"Error fetching or publishing data: {e}")
-                retry_count += 1
+            if response.status_code == 200:
+                data = response.json()
+                # Normalize Airplanes.live response to OpenSky-like schema if needed
+                if 'ac' in data and isinstance(data['ac'], list):
+                    states = self.normalize_airplanes_live(data['ac'])
+                    data = { 'time': int(time.time()), 'states': states }
+                # The OpenSky fallback is global; trim it to the requested area
+                if request_params and 'center_lat' in request_params and 'center_lon' in request_params:
+                    data['states'] = self.filter_states_to_area(
+                        data.get('states') or [],
+                        float(request_params['center_lat']),
+                        float(request_params['center_lon']),
+                        float(request_params.get('radius_km', 250)))
+                logger.info(f"Successfully fetched data with {len(data.get('states', []))} aircraft")
                 
-                # Mark current proxy as failed and try another one
-                if self.use_proxy and self.current_proxy:
-                    if self.current_proxy not in self.proxy_failures:
-                        self.proxy_failures[self.current_proxy] = 1
-                    else:
-                        self.proxy_failures[self.current_proxy] += 1
-                    
+                # Publish the data to the MQTT topics
+                self.publish_states(data)
+            else:
+                logger.error(f"API request failed with status code: {response.status_code}")
+                # Rate limiting and server errors may be the proxy's doing, so try
+                # another one for the next fetch; other 4xx mean a bad request
+                if response.status_code == 429 or response.status_code >= 500:
                     self.switch_proxy()
+        
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                requests.exceptions.RetryError) as e:
+            logger.error(f"Error fetching data: {e}")
+            
+            # Mark current proxy as failed and try another one
+            if self.use_proxy and self.current_proxy:
+                self.record_proxy_failure(self.current_proxy)
+                
+                self.switch_proxy()
+        except Exception as e:
+            # Bad request parameters or payloads are not the proxy's fault
+            logger.error(f"Error fetching or publishing data: {e}")
+    
+    @staticmethod
+    def normalize_airplanes_live(aircraft):
+        """Convert Airplanes.live 'ac' records into OpenSky-style state vectors"""
+        # One pass building each row directly; missing or null values become 0,
+        # matching OpenSky consumers' expectations. OpenSky layout: icao24,
+        # callsign, origin_country, time_position, last_contact, lon, lat,
+        # baro_altitude, on_ground, velocity, true_track, vertical_rate, + 5 unused
+        return [
+            [ac.get('icao') or ac.get('hex') or '', ac.get('call') or '', '', None, None,
+             ac.get('lon') or 0, ac.get('lat') or 0,
+             ac.get('alt_baro') or ac.get('alt_baro_ft') or 0,
+             bool(ac.get('gnd')), ac.get('gs') or 0, ac.get('track') or 0, ac.get('roc') or 0,
+             None, None, None, None, None]
+            for ac in aircraft
+        ]
+    
+    @staticmethod
+    def filter_states_to_area(states, center_lat, center_lon, radius_km):
+        """Keep state vectors whose position falls in the bounding box around a center"""
+        if not states:
+            return states
+        count = len(states)
+        # Missing positions become NaN, which fails both comparisons below
+        lons = np.fromiter((s[5] if s[5] is not None else np.nan for s in states), dtype=np.float64, count=count)
+        lats = np.fromiter((s[6] if s[6] is not None else np.nan for s in states), dtype=np.float64, count=count)
+        dlat = radius_km / 111.0
+        # Clamp near the poles, where a degree of longitude shrinks towards zero
+        dlon = radius_km / (111.0 * max(np.cos(np.radians(center_lat)), 0.01))
+        # Longitude offset wrapped into [-180, 180) so boxes across the antimeridian work
+        lon_offset = (lons - center_lon + 180.0) % 360.0 - 180.0
+        mask = (np.abs(lats - center_lat) < dlat) & (np.abs(lon_offset) < dlon)
+        return [s for s, keep in zip(states, mask.tolist()) if keep]
+    
+    def publish_states(self, data):
+        """Publish a snapshot as a delta against the previous one, plus periodic full snapshots"""
+        new_states = {state[0]: state for state in data.get('states') or [] if state and state[0]}
+        
+        with self._publish_lock:
+            # Compare position/altitude/velocity fields (OpenSky indices 5-11) per aircraft
+            added = []
+            changed = []
+            for icao24, state in new_states.items():
+                last = self._last_states.get(icao24)
+                if last is None:
+                    added.append(state)
+                elif tuple(last[5:12]) != tuple(state[5:12]):
+                    changed.append(state)
+            removed = [icao24 for icao24 in self._last_states if icao24 not in new_states]
+            self._last_states = new_states
             
-            # Wait before retrying
-            if retry_count < max_retries:
-                time.sleep(2)
+            delta = {'time': data.get('time'), 'added': added, 'changed': changed, 'removed': removed}
+            # orjson emits bytes, which paho publishes without re-encoding.
+            # QoS 1: a lost delta would leave subscribers' reconstructed state wrong
+            self.mqtt_client.publish(self.aircraft_delta_topic, orjson.dumps(delta), qos=1)
+            logger.info(f"Published delta to {self.aircraft_delta_topic}: "
+                        f"+{len(added)} ~{len(changed)} -{len(removed)}")
+            
+            full_due = time.monotonic() - self._last_full_publish >= self.full_snapshot_interval_sec
+            # The legacy topic already carries every snapshot; don't send it twice
+            compressed = (self.publish_compressed_snapshot and self._zctx is not None
+                          and not self.publish_legacy_snapshot)
+            if full_due or self.publish_legacy_snapshot or compressed:
+                payload = orjson.dumps(data)
+                if full_due:
+                    # Retained so subscribers joining mid-stream can rebuild state before applying deltas
+                    self.mqtt_client.publish(self.aircraft_full_topic, payload, qos=0, retain=True,
+                                             properties=self.full_snapshot_properties)
+                    self._last_full_publish = time.monotonic()
+                    logger.info(f"Published full snapshot to {self.aircraft_full_topic}")
+                if self.publish_legacy_snapshot:
+                    self.mqtt_client.publish(self.aircraft_data_topic, payload, qos=0)
+                    logger.info(f"Published aircraft data to {self.aircraft_data_topic}")
+                if compressed:
+                    packed = self._zctx.compress(payload)
+                    self.mqtt_client.publish(self.aircraft_compressed_topic, packed, qos=0)
+                    logger.info(f"Published compressed aircraft data to {self.aircraft_compressed_topic} "
+                                f"({len(payload)} -> {len(packed)} bytes)")
     
     def switch_proxy(self):
         """Switch to another working proxy"""
@@ -344,8 +612,16 @@ class AircraftDataBridge:
             if self.connect():
                 # Keep the main thread running
                 logger.info("MQTT bridge running. Periodic publishing is %s. Press Ctrl+C to stop.", "enabled" if self.enable_periodic_publishing else "disabled")
-                while not self.stop_event.is_set():
-                    time.sleep(1)
+                # Block until a shutdown signal sets the event instead of polling it.
+                # Windows only runs the SIGINT handler between waits, so slice it there
+                signal.signal(signal.SIGINT, lambda *_: self.stop_event.set())
+                signal.signal(signal.SIGTERM, lambda *_: self.stop_event.set())
+                if os.name == 'nt':
+                    while not self.stop_event.wait(1.0):
+                        pass
+                else:
+                    self.stop_event.wait()
+                logger.info("Stopping MQTT bridge...")
         
         except KeyboardInterrupt:
             logger.info("Stopping MQTT bridge...")
@@ -4,14 +4,43 @@ import os
 def download_csv_file(url, save_path):
     """
     Downloads a CSV file from the given URL and saves it to the specified path.
+
+    The response is streamed to disk, and the server's ETag is kept in a
+    sidecar file so an unchanged file is answered with 304 Not Modified.
     """
+    etag_path = save_path + ".etag"
+    headers = {}
+    if os.path.exists(save_path) and os.path.exists(etag_path):
+        with open(etag_path, 'r') as file:
+            headers['If-None-Match'] = file.read().strip()
+
     try:
-        response = requests.get(url)
-        response.raise_for_status()  # Raise an error for bad status codes
+        with requests.get(url, headers=headers, stream=True, timeout=30) as response:
+            if response.status_code == 304:
+                print(f"File not modified, keeping: {save_path}")
+                return
+            response.raise_for_status()  # Raise an error for bad status codes
+
+            # Stream the content to a temporary file, then swap it in;
+            # iter_content decodes gzip and raises mid-stream connection
+            # errors as RequestException
+            partial_path = save_path + ".part"
+            try:
+                with open(partial_path, 'wb') as file:
+                    for chunk in response.iter_content(64 * 1024):
+                        file.write(chunk)
+                os.replace(partial_path, save_path)
+            except BaseException:
+                if os.path.exists(partial_path):
+                    os.remove(partial_path)
+                raise
 
-        # Save the content to a file
-        with open(save_path, 'wb') as file:
-            file.write(response.content)
+            etag = response.headers.get('ETag')
+            if etag:
+                with open(etag_path, 'w') as file:
+                    file.write(etag)
+            elif os.path.exists(etag_path):
+                os.remove(etag_path)
         print(f"File downloaded successfully: {save_path}")
     except requests.exceptions.RequestException as e:
         print(f"Failed to download the file: {e}")
@@ -18,8 +18,11 @@ class ProxyTrafficDataManager:
         self.proxy_host = None
         self.proxy_port = None
         self.max_retries = max_retries
-        self.verified_proxies = []
-        self.failed_proxies = []
+        self.verified_proxies = set()
+        self.failed_proxies = set()
+        self._proxy_set = set()
+        # proxy -> (success_count, failure_count, ewma_rtt_seconds)
+        self.stats = {}
         
         self.setup_logging()
         self.load_proxies(proxy_csv_path)
@@ -41,6 +44,7 @@ class ProxyTrafficDataManager:
                     for row in reader:
                         if row and row[0].strip():
                             self.proxy_list.append(row[0].strip())
+                self._proxy_set = set(self.proxy_list)
                 
                 self.logger.info(f"Loaded {len(self.proxy_list)} proxies from {file_path}")
             except Exception as e:
@@ -48,15 +52,34 @@ class ProxyTrafficDataManager:
         else:
             self.logger.error(f"Proxy file not found at: {file_path}")
     
+    def record_result(self, proxy, success, rtt=None, alpha=0.3):
+        """Update success/failure counts and the round-trip-time EWMA for a proxy"""
+        ok, fail, ewma_rtt = self.stats.get(proxy, (0, 0, None))
+        if success:
+            ok += 1
+        else:
+            fail += 1
+        if rtt is not None:
+            ewma_rtt = rtt if ewma_rtt is None else alpha * rtt + (1 - alpha) * ewma_rtt
+        self.stats[proxy] = (ok, fail, ewma_rtt)
+    
+    def proxy_weight(self, proxy):
+        """Selection weight: smoothed success rate divided by typical round-trip time"""
+        ok, fail, ewma_rtt = self.stats.get(proxy, (0, 0, None))
+        success_rate = (ok + 1) / (ok + fail + 2)
+        return success_rate / max(0.05, ewma_rtt if ewma_rtt is not None else 1.0)
+    
     def select_random_proxy(self):
         """Select a random proxy from the loaded list, excluding failed ones"""
-        available_proxies = [p for p in self.proxy_list if p not in self.failed_proxies]
+        available_proxies = tuple(self._proxy_set - self.failed_proxies)
         
         if not available_proxies:
             self.logger.warning("No available proxies left to try")
             return False
         
-        self.selected_proxy = random.choice(available_proxies)
+        # Favour proxies that have been reliable and fast without hard-excluding new ones
+        weights = [self.proxy_weight(p) for p in available_proxies]
+        self.selected_proxy = random.choices(available_proxies, weights=weights, k=1)[0]
         self.logger.info(f"Selected Proxy: {self.selected_proxy}")
         self.parse_selected_proxy()
         return True
@@ -112,21 +135,23 @@ class ProxyTrafficDataManager:
         
         try:
             self.logger.info(f"Verifying proxy: {proxy_url}")
+            start = time.perf_counter()
             response = requests.get(test_url, proxies=proxies, timeout=timeout)
+            rtt = time.perf_counter() - start
             if response.status_code == 200:
                 self.logger.info(f"Proxy verification successful: {proxy_url}")
-                if self.selected_proxy not in self.verified_proxies:
-                    self.verified_proxies.append(self.selected_proxy)
+                self.verified_proxies.add(self.selected_proxy)
+                self.record_result(self.selected_proxy, True, rtt)
                 return True
             else:
                 self.logger.warning(f"Proxy verification failed with status code: {response.status_code} for {proxy_url}")
-                if self.selected_proxy not in self.failed_proxies:
-                    self.failed_proxies.append(self.selected_proxy)
+                self.failed_proxies.add(self.selected_proxy)
+                self.record_result(self.selected_proxy, False, rtt)
                 return False
         except Exception as e:
             self.logger.warning(f"Proxy verification failed: {proxy_url}, Error: {str(e)}")
-            if self.selected_proxy not in self.failed_proxies:
-                self.failed_proxies.append(self.selected_proxy)
+            self.failed_proxies.add(self.selected_proxy)
+            self.record_result(self.selected_proxy, False)
         
         return False
     
@@ -151,6 +176,7 @@ class ProxyTrafficDataManager:
         
         try:
             # Make the API request
+            start = time.perf_counter()
             response = requests.request(
                 method=method,
                 url=url,
@@ -158,12 +184,14 @@ class ProxyTrafficDataManager:
                 proxies=proxies,
                 timeout=30
             )
+            self.record_result(self.selected_proxy, response.status_code == 200,
+                               time.perf_counter() - start)
             
             return response
         except Exception as e:
             self.logger.error(f"Request error: {str(e)}")
-            if self.selected_proxy not in self.failed_proxies:
-                self.failed_proxies.append(self.selected_proxy)
+            self.failed_proxies.add(self.selected_proxy)
+            self.record_result(self.selected_proxy, False)
             return None
     
     def fetch_data(self, url, retry_delay=1):
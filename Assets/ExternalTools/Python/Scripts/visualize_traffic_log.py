@@ -1,14 +1,22 @@
-import json
 import os
 import math
+import mmap
 import argparse
+import subprocess
+import tempfile
 import time
+from array import array
 from datetime import datetime
+from itertools import islice
+from multiprocessing import Pool
 
+import orjson
+import numpy as np
 import matplotlib
 matplotlib.use('Agg')
 import matplotlib.pyplot as plt
-from matplotlib.animation import FFMpegWriter
+
+MAX_LABELS = 50
 
 def haversine_km(lat1, lon1, lat2, lon2):
     R = 6371.0
@@ -18,82 +26,170 @@ def haversine_km(lat1, lon1, lat2, lon2):
     c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
     return R * c
 
-def load_jsonl(path):
-    with open(path, 'r', encoding='utf-8') as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            yield json.loads(line)
+def haversine_km_np(lat1, lon1, lats, lons):
+    """Vectorized haversine_km from one point to arrays of points."""
+    R = 6371.0
+    lats = np.asarray(lats, dtype=np.float64)
+    lons = np.asarray(lons, dtype=np.float64)
+    dlat = np.radians(lats - lat1)
+    dlon = np.radians(lons - lon1)
+    a = np.sin(dlat * 0.5)**2 + math.cos(math.radians(lat1)) * np.cos(np.radians(lats)) * np.sin(dlon * 0.5)**2
+    return R * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+def iter_lines(path, offset=0):
+    """Yield (byte_offset, line) for each non-empty line, starting at a byte offset."""
+    # Read-only mapping: the log is never held in memory
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            mm.seek(offset)
+            while True:
+                pos = mm.tell()
+                line = mm.readline()
+                if not line:
+                    return
+                line = line.strip()
+                if line:
+                    yield pos, line
+
+def load_jsonl(path, offset=0, limit=None):
+    lines = iter_lines(path, offset)
+    if limit is not None:
+        lines = islice(lines, limit)
+    for _, line in lines:
+        yield orjson.loads(line)
+
+def scan_log(path):
+    """Return (frame_offsets, (lat_min, lat_max, lon_min, lon_max)) without keeping frames in memory."""
+    offsets = array('q')
+    lat_min = lon_min = math.inf
+    lat_max = lon_max = -math.inf
+    for pos, line in iter_lines(path):
+        offsets.append(pos)
+        for a in orjson.loads(line).get('aircraft', []):
+            lat = a['latitude']
+            lon = a['longitude']
+            if lat and lon:
+                lat_min = min(lat_min, lat); lat_max = max(lat_max, lat)
+                lon_min = min(lon_min, lon); lon_max = max(lon_max, lon)
+    if lat_min == math.inf:
+        return offsets, None
+    return offsets, (lat_min, lat_max, lon_min, lon_max)
+
+def render_frames(frames, output, extents, fps):
+    lat_min, lat_max, lon_min, lon_max = extents
+    fig, ax = plt.subplots(figsize=(8, 6), dpi=150)
+    ax.set_xlim(lon_min, lon_max)
+    ax.set_ylim(lat_min, lat_max)
+    ax.set_xlabel('Longitude')
+    ax.set_ylabel('Latitude')
+    title = ax.set_title('Air Traffic Log Playback')
+
+    # Artists are created once and updated in place each frame; clearing the
+    # axes would rebuild ticks, formatters and renderer caches every frame
+    scat = ax.scatter([], [], s=10, c='tab:blue', alpha=0.8)
+    texts = [ax.text(0, 0, '', fontsize=6, color='black', visible=False) for _ in range(MAX_LABELS)]
+
+    # Pipe raw RGBA straight from the Agg buffer into ffmpeg; this skips the
+    # per-frame PNG encode/decode round trip of matplotlib's FFMpegWriter
+    w, h = fig.canvas.get_width_height()
+    proc = subprocess.Popen(['ffmpeg', '-y', '-loglevel', 'error',
+                             '-f', 'rawvideo', '-pix_fmt', 'rgba', '-s', f'{w}x{h}', '-r', str(fps), '-i', '-',
+                             '-pix_fmt', 'yuv420p', '-c:v', 'libx264', '-preset', 'veryfast',
+                             '-metadata', 'title=Traffic Playback',
+                             '-metadata', 'artist=visualize_traffic_log.py',
+                             output], stdin=subprocess.PIPE)
+
+    try:
+        for fr in frames:
+            ts = fr.get('time', 0)
+            dt = datetime.utcfromtimestamp(ts).strftime('%Y-%m-%d %H:%M:%S UTC')
+            title.set_text(f'Air Traffic at {dt}  (n={fr.get("count", 0)})')
+
+            ac = fr.get('aircraft', [])
+            xs = [a['longitude'] for a in ac]
+            ys = [a['latitude'] for a in ac]
+            scat.set_offsets(np.column_stack([xs, ys]) if ac else np.empty((0, 2)))
+            # show some labels
+            for text, a in zip(texts, ac[:MAX_LABELS]):
+                text.set_position((a['longitude'], a['latitude']))
+                text.set_text(a.get('callsign') or a['icao24'])
+                text.set_visible(True)
+            for text in texts[len(ac):]:
+                text.set_visible(False)
+
+            fig.canvas.draw()
+            proc.stdin.write(fig.canvas.buffer_rgba())
+    finally:
+        proc.stdin.close()
+        proc.wait()
+        plt.close(fig)
+    if proc.returncode:
+        raise subprocess.CalledProcessError(proc.returncode, 'ffmpeg')
+
+def render_chunk(task):
+    """Pool worker: render one contiguous run of frames to its own mp4 segment."""
+    idx, path, offset, count, extents, fps, seg_dir = task
+    seg_path = os.path.join(seg_dir, f'seg_{idx}.mp4')
+    render_frames(load_jsonl(path, offset, count), seg_path, extents, fps)
+    return seg_path
 
 def main():
     parser = argparse.ArgumentParser(description='Render traffic logs jsonl to mp4.')
     parser.add_argument('input', help='Path to jsonl log file')
     parser.add_argument('--output', default=None, help='Output mp4 path (default next to input)')
     parser.add_argument('--fps', type=int, default=5)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Render processes (default: CPU count)')
     args = parser.parse_args()
 
     if args.output is None:
         base, _ = os.path.splitext(args.input)
         args.output = base + '.mp4'
 
-    frames = list(load_jsonl(args.input))
-    if not frames:
+    # First pass: frame offsets and map extents
+    offsets, extents = scan_log(args.input)
+    if not offsets:
         print('No frames found')
         return
-
-    # Determine map extents
-    lats = []
-    lons = []
-    for fr in frames:
-        for a in fr.get('aircraft', []):
-            if a['latitude'] and a['longitude']:
-                lats.append(a['latitude'])
-                lons.append(a['longitude'])
-    if not lats or not lons:
+    if extents is None:
         print('No positions in log')
         return
 
-    lat_min, lat_max = min(lats), max(lats)
-    lon_min, lon_max = min(lons), max(lons)
+    lat_min, lat_max, lon_min, lon_max = extents
     # padding
     lat_pad = (lat_max - lat_min) * 0.1 or 0.5
     lon_pad = (lon_max - lon_min) * 0.1 or 0.5
     lat_min -= lat_pad; lat_max += lat_pad
     lon_min -= lon_pad; lon_max += lon_pad
-
-    fig, ax = plt.subplots(figsize=(8, 6))
-    ax.set_xlim(lon_min, lon_max)
-    ax.set_ylim(lat_min, lat_max)
-    ax.set_xlabel('Longitude')
-    ax.set_ylabel('Latitude')
-    ax.set_title('Air Traffic Log Playback')
-
-    metadata = dict(title='Traffic Playback', artist='visualize_traffic_log.py')
-    writer = FFMpegWriter(fps=args.fps, metadata=metadata)
-
-    with writer.saving(fig, args.output, dpi=150):
-        for fr in frames:
-            ax.cla()
-            ax.set_xlim(lon_min, lon_max)
-            ax.set_ylim(lat_min, lat_max)
-            ts = fr.get('time', 0)
-            dt = datetime.utcfromtimestamp(ts).strftime('%Y-%m-%d %H:%M:%S UTC')
-            ax.set_title(f'Air Traffic at {dt}  (n={fr.get("count", 0)})')
-
-            ac = fr.get('aircraft', [])
-            xs = [a['longitude'] for a in ac]
-            ys = [a['latitude'] for a in ac]
-            ax.scatter(xs, ys, s=10, c='tab:blue', alpha=0.8)
-            # show some labels
-            for a in ac[:50]:
-                ax.text(a['longitude'], a['latitude'], a.get('callsign') or a['icao24'], fontsize=6, color='black')
-
-            writer.grab_frame()
+    extents = (lat_min, lat_max, lon_min, lon_max)
+
+    # Second pass: stream frames straight into the writer(s)
+    frame_count = len(offsets)
+    workers = max(1, min(args.workers, frame_count))
+    if workers == 1:
+        render_frames(load_jsonl(args.input), args.output, extents, args.fps)
+    else:
+        # Each worker renders a contiguous chunk to its own segment; the segments
+        # are then joined by ffmpeg's concat demuxer without re-encoding
+        chunk_size = math.ceil(frame_count / workers)
+        with tempfile.TemporaryDirectory() as seg_dir:
+            tasks = [(i, args.input, offsets[start], chunk_size, extents, args.fps, seg_dir)
+                     for i, start in enumerate(range(0, frame_count, chunk_size))]
+            with Pool(workers) as pool:
+                seg_paths = pool.map(render_chunk, tasks)
+
+            list_path = os.path.join(seg_dir, 'list.txt')
+            with open(list_path, 'w', encoding='utf-8') as f:
+                for seg_path in seg_paths:
+                    escaped = seg_path.replace("'", "'\\''")
+                    f.write(f"file '{escaped}'\n")
+            subprocess.run(['ffmpeg', '-y', '-loglevel', 'error', '-f', 'concat', '-safe', '0',
+                            '-i', list_path, '-c', 'copy', args.output], check=True)
 
     print('Saved to', args.output)
 
 if __name__ == '__main__':
     main()
 
-
@@ -1,39 +1,39 @@
+import matplotlib
+matplotlib.use('Agg')  # file output only; no GUI backend or event loop
+import matplotlib.collections as mc
 import matplotlib.pyplot as plt
 import numpy as np
 
+# Sprite resolution; line widths are in points, so proportions hold at any DPI
+TEXTURE_DPI = 128
+
 def draw_circle_with_ticks(radius_nm, num_ticks):
     # Convert nautical miles to a generic unit (e.g., kilometers or arbitrary units)
     radius = radius_nm  # Assuming 1 NM = 1 unit for simplicity
     tick_length = 0.2  # Length of the ticks
 
     # Create the figure with a transparent background
-    plt.figure(figsize=(6, 6), facecolor='none')
-    ax = plt.gca()
+    fig = plt.figure(figsize=(6, 6), facecolor='none')
+    ax = fig.gca()
     ax.set_facecolor('none')  # Transparent background
 
-    # Add ticks on the top hemisphere
-    for i in range(num_ticks):
-        angle = (i / num_ticks) * np.pi  # Divide the top half into equal parts
-        tick_x_start = radius * np.cos(angle)
-        tick_y_start = radius * np.sin(angle)
-        tick_x_end = (radius + tick_length) * np.cos(angle)
-        tick_y_end = (radius + tick_length) * np.sin(angle)
-        plt.plot([tick_x_start, tick_x_end], [tick_y_start, tick_y_end], color='white', linewidth=1.5)  # White tick lines
-
-    # Add ticks on the bottom hemisphere
-    for i in range(num_ticks):
-        angle = np.pi + (i / num_ticks) * np.pi  # Divide the bottom half into equal parts
-        tick_x_start = radius * np.cos(angle)
-        tick_y_start = radius * np.sin(angle)
-        tick_x_end = (radius + tick_length) * np.cos(angle)
-        tick_y_end = (radius + tick_length) * np.sin(angle)
-        plt.plot([tick_x_start, tick_x_end], [tick_y_start, tick_y_end], color='white', linewidth=1.5)  # White tick lines
+    # Ticks evenly spaced around both hemispheres, built as one set of segments
+    angles = np.linspace(0, 2 * np.pi, 2 * num_ticks, endpoint=False)
+    cos_a, sin_a = np.cos(angles), np.sin(angles)
+    inner = np.stack([radius * cos_a, radius * sin_a], axis=-1)
+    outer = np.stack([(radius + tick_length) * cos_a, (radius + tick_length) * sin_a], axis=-1)
+    segments = np.stack([inner, outer], axis=1)
+    ax.add_collection(mc.LineCollection(segments, colors='white', linewidths=1.5,
+                                       capstyle='projecting'))  # White tick lines
+    ax.autoscale_view()
 
     # Formatting
-    plt.gca().set_aspect('equal', adjustable='box')
-    plt.axis('off')  # Turn off the axes for a clean look
-    plt.savefig('circle_with_ticks.png', dpi=300, transparent=True)  # Save with transparent background
-    plt.show()
+    ax.set_aspect('equal', adjustable='box')
+    ax.axis('off')  # Turn off the axes for a clean look
+    fig.savefig('circle_with_ticks.png', dpi=TEXTURE_DPI, transparent=True,
+                pil_kwargs={'compress_level': 1})  # Save with transparent background
+    plt.close(fig)
 
-# Draw the circle with a 2NM radius and 7 ticks on each hemisphere
-draw_circle_with_ticks(radius_nm=2, num_ticks=7)
\ No newline at end of file
+if __name__ == '__main__':
+    # Draw the circle with a 2NM radius and 7 ticks on each hemisphere
+    draw_circle_with_ticks(radius_nm=2, num_ticks=7)
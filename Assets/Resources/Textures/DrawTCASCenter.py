@@ -1,29 +1,37 @@
+import matplotlib
+matplotlib.use('Agg')  # file output only; no GUI backend or event loop
 import matplotlib.pyplot as plt
 
-# Create a figure and axis
-fig, ax = plt.subplots()
+# Output resolution of the sprite
+TEXTURE_DPI = 128
 
-# Draw the vertical line
-ax.plot([0, 0], [0.3, -0.22], color='white', linewidth=5)
+def draw_tcas_center(filename):
+    # Create a figure and axis
+    fig, ax = plt.subplots()
 
-# Draw the horizontal line (arms)
-ax.plot([-0.2, 0.2], [0.2, 0.2], color='white', linewidth=5)
+    # Draw the vertical line
+    ax.plot([0, 0], [0.3, -0.22], color='white', linewidth=5)
 
-# Draw the horizontal tail
-ax.plot([-0.1, 0.1], [-0.2, -0.2], color='white', linewidth=5)
+    # Draw the horizontal line (arms)
+    ax.plot([-0.2, 0.2], [0.2, 0.2], color='white', linewidth=5)
 
-# Set the background to transparent
-fig.patch.set_alpha(0)
-ax.set_facecolor((0, 0, 0, 0))  # Transparent background
+    # Draw the horizontal tail
+    ax.plot([-0.1, 0.1], [-0.2, -0.2], color='white', linewidth=5)
 
-# Remove axes for a clean look
-ax.axis('off')
+    # Set the background to transparent
+    fig.patch.set_alpha(0)
+    ax.set_facecolor((0, 0, 0, 0))  # Transparent background
 
-# Set the aspect ratio to equal
-ax.set_aspect('equal')
+    # Remove axes for a clean look
+    ax.axis('off')
 
-# Save the figure with a transparent background
-plt.savefig("plane_symbol.png", dpi=300, transparent=True)
+    # Set the aspect ratio to equal
+    ax.set_aspect('equal')
 
-# Show the plot
-plt.show()
\ No newline at end of file
+    # Save the figure with a transparent background
+    fig.savefig(filename, dpi=TEXTURE_DPI, transparent=True,
+                pil_kwargs={'compress_level': 1})
+    plt.close(fig)
+
+if __name__ == '__main__':
+    draw_tcas_center("plane_symbol.png")
@@ -1,21 +1,29 @@
+import matplotlib
+matplotlib.use('Agg')  # file output only; no GUI backend or event loop
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
 
+# ~420px symbols once the tight bbox is applied
+TEXTURE_DPI = 128
+
 # Define colors
 cyan_color = '#00C8FF'
 yellow_color = '#FFD700'
 red_color = '#FF3A33'
 
-# Function to create a figure for a specific symbol
-def create_symbol_figure(symbol_func, filename, title):
+# Function to render several symbols through one figure; figure setup is paid once
+def create_symbol_figures(symbols):
     fig, ax = plt.subplots(figsize=(4, 4), facecolor='#f0f0f8')
-    ax.set_facecolor('#f8f8ff')
-    ax.set_xlim(-2, 2)
-    ax.set_ylim(-2, 2)
-    ax.axis('off')
-    symbol_func(ax)
-    ax.set_title(title, fontsize=14, fontweight='bold', y=0.9)
-    plt.savefig(filename, dpi=300, bbox_inches='tight',transparent=True)  # Save with transparent background
+    for symbol_func, filename, title in symbols:
+        ax.clear()  # drops the previous symbol's patches and resets axes styling
+        ax.set_facecolor('#f8f8ff')
+        ax.set_xlim(-2, 2)
+        ax.set_ylim(-2, 2)
+        ax.axis('off')
+        symbol_func(ax)
+        ax.set_title(title, fontsize=14, fontweight='bold', y=0.9)
+        fig.savefig(filename, dpi=TEXTURE_DPI, bbox_inches='tight', transparent=True,
+                    pil_kwargs={'compress_level': 1})  # Save with transparent background
     plt.close(fig)
 
 # Function to draw "Other Traffic" symbol
@@ -64,8 +72,11 @@ def draw_threat(ax):
     )
     ax.add_patch(threat)
 
-# Create and save individual figures
-create_symbol_figure(draw_other_traffic, 'other_traffic.png', None)
-create_symbol_figure(draw_proximate_traffic, 'proximate_traffic.png', None)
-create_symbol_figure(draw_intruding_traffic, 'intruding_traffic.png', None)
-create_symbol_figure(draw_threat, 'threat.png', None)
\ No newline at end of file
+if __name__ == '__main__':
+    # Create and save individual figures
+    create_symbol_figures([
+        (draw_other_traffic, 'other_traffic.png', None),
+        (draw_proximate_traffic, 'proximate_traffic.png', None),
+        (draw_intruding_traffic, 'intruding_traffic.png', None),
+        (draw_threat, 'threat.png', None),
+    ])
@@ -2,10 +2,13 @@
 MQTT Handler for MqttWeather
 Handles communication with MQTT broker
 """
-import time
 import paho.mqtt.client as mqtt
+from paho.mqtt.packettypes import PacketTypes
+from paho.mqtt.properties import Properties
 import json
-import base64
+import os
+import queue
+import struct
 import threading
 import logging
 from .WeatherService import WeatherService
@@ -17,6 +20,9 @@ logging.basicConfig(level=logging.INFO,
                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Packed coordinates: lat, lon, tilt, gain, heading as little-endian float32
+PACKED_COORDINATES = struct.Struct('<5f')
+
 class MqttHandler:
     """
     Handles MQTT communication for MqttWeather
@@ -52,9 +58,27 @@ class MqttHandler:
         self.weather_topic = weather_topic
         self.coordinates_topic = coordinates_topic
         self.radar_image_topic = radar_image_topic
+        # Binary twin of the coordinates topic; a separate topic because a
+        # 20-byte CSV string can't be told apart from packed floats by size
+        self.coordinates_packed_topic = f"{coordinates_topic}/packed"
+        
+        # Initialize MQTT v5 client (topic aliases); paho 2.x takes the
+        # callback API version first, 1.x has no such argument
+        callback_api = getattr(mqtt, "CallbackAPIVersion", None)
+        if callback_api is not None:
+            self.client = mqtt.Client(callback_api.VERSION2, protocol=mqtt.MQTTv5)
+        else:
+            self.client = mqtt.Client(protocol=mqtt.MQTTv5)
+        self.keepalive = 15  # short keepalive so a dead link is noticed quickly
         
-        # Initialize MQTT client
-        self.client = mqtt.Client()
+        # Topic alias for the radar image topic, bound per connection
+        self.radar_topic_alias = None
+        self._radar_alias_bound = False
+        self._radar_alias_props = None
+        # One QoS 1 message in flight at a time. The queue stays unbounded: a
+        # full queue rejects the newest publish and keeps the stale one, and the
+        # one-slot job queue already coalesces updates before they get here
+        self.client.max_inflight_messages_set(1)
         self.client.on_connect = self.on_connect
         self.client.on_message = self.on_message
         self.client.on_disconnect = self.on_disconnect
@@ -82,18 +106,32 @@ class MqttHandler:
         # Lock for thread safety
         self.lock = threading.Lock()
         
-        # Initialize running state
+        # Initialize running state; start() blocks on the event until stop() sets it
         self.running = False
+        self._stop_evt = threading.Event()
+        
+        # Single publish worker fed by a one-slot queue: position updates that
+        # arrive while a publish is in flight coalesce into one follow-up job
+        self._job_q = queue.Queue(maxsize=1)
+        self._worker = threading.Thread(target=self._worker_loop, daemon=True)
+        self._worker.start()
 
-    def on_connect(self, client, userdata, flags, rc):
+    def on_connect(self, client, userdata, flags, rc, properties=None):
         """
         Callback for when the client connects to the broker
         """
         if rc == 0:
             logger.info(f"Connected to MQTT broker at {self.broker}:{self.port}")
-            # Subscribe to coordinates topic
-            client.subscribe(self.coordinates_topic)
-            logger.info(f"Subscribed to {self.coordinates_topic}")
+            # Aliases don't survive reconnects; use one only if the broker allows it
+            alias_max = getattr(properties, "TopicAliasMaximum", 0) if properties is not None else 0
+            self.radar_topic_alias = 1 if alias_max >= 1 else None
+            self._radar_alias_bound = False
+            if self.radar_topic_alias is not None:
+                self._radar_alias_props = Properties(PacketTypes.PUBLISH)
+                self._radar_alias_props.TopicAlias = self.radar_topic_alias
+            # Subscribe to coordinates topics (CSV and packed)
+            client.subscribe([(self.coordinates_topic, 0), (self.coordinates_packed_topic, 0)])
+            logger.info(f"Subscribed to {self.coordinates_topic} and {self.coordinates_packed_topic}")
         else:
             logger.error(f"Failed to connect to MQTT broker, return code: {rc}")
     
@@ -101,20 +139,13 @@ class MqttHandler:
         """
         Callback for when a message is received from the broker
         """
-        if msg.topic == self.coordinates_topic:
+        if msg.topic in (self.coordinates_topic, self.coordinates_packed_topic):
             # Parse coordinates message
             try:
-                message = msg.payload.decode("utf-8")
-                parts = message.split(',')
+                coordinates = self.parse_coordinates(msg.topic, msg.payload)
                 
-                if len(parts) >= 2:
-                    new_lat = float(parts[0])
-                    new_lon = float(parts[1])
-                    
-                    # Get tilt and gain if available
-                    new_tilt = float(parts[2]) if len(parts) > 2 else 0
-                    new_gain = float(parts[3]) if len(parts) > 3 else 0
-                    new_heading = float(parts[4]) if len(parts) > 4 else 0
+                if coordinates is not None:
+                    new_lat, new_lon, new_tilt, new_gain, new_heading = coordinates
                     
                     # Check if position has changed enough to warrant an update
                     position_changed = False
@@ -146,35 +177,83 @@ class MqttHandler:
                         if position_changed:
                             # Store the position for future comparisons
                             self.last_processed_position = (new_lat, new_lon, new_tilt, new_gain, new_heading)
-                            logger.info(f"Position updated: lat={new_lat}, lon={new_lon}, " +
-                                      f"tilt={new_tilt}, gain={new_gain}, heading={new_heading}")
-                            
-                            # Publish weather data and radar image immediately when position changes
-                            threading.Thread(target=self.publish_data).start()
-                        else:
-                            logger.info("Position update received but no significant change detected")
+                    
+                    # Log and enqueue outside the lock so slow log handlers don't stall other messages
+                    if position_changed:
+                        logger.info(f"Position updated: lat={new_lat}, lon={new_lon}, " +
+                                  f"tilt={new_tilt}, gain={new_gain}, heading={new_heading}")
+                        
+                        # Publish weather data and radar image immediately when position changes
+                        self._request_publish()
+                    else:
+                        logger.info("Position update received but no significant change detected")
                     
             except Exception as e:
                 logger.error(f"Error parsing coordinates message: {e}")
     
-    def on_disconnect(self, client, userdata, rc):
+    def parse_coordinates(self, topic, payload):
+        """
+        Parse a coordinates payload
+        
+        Parameters
+        ----------
+        topic : str
+            Topic the payload arrived on
+        payload : bytes
+            Packed "<5f" on the packed topic, otherwise
+            "latitude,longitude[,tilt[,gain[,heading]]]" text
+            
+        Returns
+        -------
+        tuple or None
+            (lat, lon, tilt, gain, heading), or None if fewer than two values
+        """
+        if topic == self.coordinates_packed_topic:
+            return PACKED_COORDINATES.unpack(payload)
+        values = [float(part) for part in payload.split(b',', 5)[:5]]
+        if len(values) < 2:
+            return None
+        # Missing tilt, gain and heading default to 0
+        return tuple(values) + (0.0,) * (5 - len(values))
+    
+    def on_disconnect(self, client, userdata, *args):
         """
         Callback for when the client disconnects from the broker
         """
+        # Callback API v2 passes (flags, reason_code, properties); paho 1.x v5 passes (reason_code, properties)
+        rc = args[1] if len(args) == 3 else args[0]
         if rc != 0:
             logger.warning(f"Unexpected disconnection from MQTT broker, return code: {rc}")
         else:
             logger.info("Disconnected from MQTT broker")
             
+    def _request_publish(self):
+        """
+        Queue a publish job unless one is already pending
+        """
+        try:
+            self._job_q.put_nowait(True)
+        except queue.Full:
+            # The pending job reads the latest position when it runs
+            pass
+    
+    def _worker_loop(self):
+        """
+        Run queued publish jobs until the stop sentinel arrives
+        """
+        while True:
+            job = self._job_q.get()
+            if job is None:
+                break
+            self.publish_data()
+    
     def publish_data(self):
         """
         Publish weather data and radar image to MQTT topics
         """
         with self.lock:
-            if not self.position_received:
-                logger.info("No position data received yet, skipping data publishing")
-                return
-                
+            position_received = self.position_received
+            
             # Get current position
             lat = self.user_lat
             lon = self.user_lon
@@ -182,42 +261,70 @@ class MqttHandler:
             gain = self.gain
             heading = self.heading
         
+        if not position_received:
+            logger.info("No position data received yet, skipping data publishing")
+            return
+        
         try:
             # Get weather data
             weather_data = self.weather_service.fetch_real_weather_data(
                 lat, lon)
                 
-            # Generate radar visualization
-            image_path = self.visualization_service.generate_visualization(
+            # Generate radar visualization in memory; nothing is written to disk
+            img_data = self.visualization_service.generate_visualization(
                 user_lat=lat, 
                 user_lon=lon, 
                 heading=heading,
                 tilt=tilt,
-                gain=gain
+                gain=gain,
+                as_bytes=True
             )
             
             # Publish weather data to MQTT
-            self.client.publish(self.weather_topic, weather_data, qos=1, retain=True)
-            logger.info(f"Published weather data to {self.weather_topic}")
+            info = self.client.publish(self.weather_topic, weather_data, qos=1, retain=True)
+            if info.rc == mqtt.MQTT_ERR_SUCCESS:
+                logger.info(f"Published weather data to {self.weather_topic}")
+            else:
+                logger.warning(f"Failed to publish weather data: {mqtt.error_string(info.rc)}")
             
             # Publish radar image to MQTT
-            with open(image_path, "rb") as img_file:
-                img_data = img_file.read()
-                # Encode image data as base64 string
-                b64_data = base64.b64encode(img_data).decode("utf-8")
-                self.client.publish(self.radar_image_topic, b64_data, qos=1, retain=True)
-                logger.info(f"Published radar image to {self.radar_image_topic}")
+            if img_data:
+                # MQTT payloads are binary-safe, so the PNG goes out as-is. QoS 0:
+                # each frame supersedes the last, so a PUBACK round trip buys nothing;
+                # retained so new subscribers still get the latest frame
+                info = self._publish_radar_image(img_data)
+                if info.rc == mqtt.MQTT_ERR_SUCCESS:
+                    logger.info(f"Published radar image to {self.radar_image_topic}")
+                else:
+                    logger.warning(f"Failed to publish radar image: {mqtt.error_string(info.rc)}")
+            else:
+                logger.warning("Radar visualization failed, skipping image publish")
                 
         except Exception as e:
             logger.error(f"Error publishing data: {e}")
             
+    def _publish_radar_image(self, img_data):
+        """
+        Publish a radar frame, via the topic alias once it is bound
+        """
+        if self.radar_topic_alias is None:
+            return self.client.publish(self.radar_image_topic, img_data, qos=0, retain=True)
+        # The first publish carries topic and alias; later ones send only the 2-byte alias
+        # The alias counts as bound only once a publish carrying the topic went out
+        topic = "" if self._radar_alias_bound else self.radar_image_topic
+        info = self.client.publish(topic, img_data, qos=0, retain=True,
+                                   properties=self._radar_alias_props)
+        if info.rc == mqtt.MQTT_ERR_SUCCESS:
+            self._radar_alias_bound = True
+        return info
+    
     def start(self):
         """
         Connect to MQTT broker and start publishing data
         """
         try:
             # Connect to MQTT broker
-            self.client.connect(self.broker, self.port, 60)
+            self.client.connect(self.broker, self.port, self.keepalive)
             
             # Start MQTT loop in a background thread
             self.client.loop_start()
@@ -226,10 +333,14 @@ class MqttHandler:
             self.running = True
             
             # Keep running until interrupted
-            while self.running:
-                # We no longer publish data at regular intervals
-                # Data will only be published when a position update is received
-                time.sleep(1)
+            # We no longer publish data at regular intervals
+            # Data will only be published when a position update is received.
+            # Ctrl+C can't interrupt an untimed wait on Windows, so slice it there
+            if os.name == 'nt':
+                while not self._stop_evt.wait(1.0):
+                    pass
+            else:
+                self._stop_evt.wait()
                 
         except KeyboardInterrupt:
             logger.info("Interrupted by user")
@@ -244,6 +355,14 @@ class MqttHandler:
         Stop the MQTT handler
         """
         self.running = False
+        self._stop_evt.set()
+        # Replace any pending job with the stop sentinel and let the worker finish
+        try:
+            self._job_q.get_nowait()
+        except queue.Empty:
+            pass
+        self._job_q.put(None)
+        self._worker.join(timeout=5)
         self.client.loop_stop()
         self.client.disconnect()
         logger.info("MQTT handler stopped")
\ No newline at end of file
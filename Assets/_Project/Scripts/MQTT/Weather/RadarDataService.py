@@ -3,10 +3,16 @@ Radar Data Service Module
 Provides functionality to fetch NEXRAD radar data from AWS
 """
 import datetime
+import json
+import logging
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 import boto3
+from botocore.config import Config
 import numpy as np
-import pyart
+
+logger = logging.getLogger(__name__)
 
 
 class RadarDataService:
@@ -26,7 +32,77 @@ class RadarDataService:
         # Ensure the data folder exists
         if not os.path.exists(data_folder):
             os.makedirs(data_folder)
+        
+        # One S3 client for the service's lifetime: construction resolves config,
+        # credentials and endpoints, and its connection pool keeps TLS sessions alive
+        self.s3 = boto3.client(
+            "s3",
+            config=Config(max_pool_connections=16, retries={"max_attempts": 2})
+        )
+        
+        # Bucket listings per prefix: (monotonic time listed, objects). New scans
+        # land about every 5 minutes, so a short TTL skips most list round trips
+        self.list_cache_ttl = 60
+        self._list_cache = {}
+        
+        # ETag of the object behind each radar_data_N file, so unchanged scans aren't re-downloaded
+        self.etag_path = os.path.join(data_folder, ".etags.json")
+            
+    def _list_radar_objects(self, bucket, file_prefix):
+        """
+        List the objects under a prefix, reusing a recent listing
+        
+        Parameters
+        ----------
+        bucket : str
+            S3 bucket name
+        file_prefix : str
+            Key prefix (date and radar station)
             
+        Returns
+        -------
+        list
+            S3 object summaries in key order
+        """
+        now = time.monotonic()
+        cached = self._list_cache.get(file_prefix)
+        if cached is not None and now - cached[0] < self.list_cache_ttl:
+            return cached[1]
+        
+        known = cached[1] if cached is not None else []
+        params = {"Bucket": bucket, "Prefix": file_prefix}
+        if known:
+            # Keys embed the scan time, so only keys after the newest known one are new
+            params["StartAfter"] = known[-1]["Key"]
+        response = self.s3.list_objects_v2(**params)
+        contents = known + response.get("Contents", [])
+        # Drop other expired prefixes (earlier days, other stations) so the cache
+        # doesn't grow for as long as the service runs
+        for prefix in [p for p, (listed, _) in self._list_cache.items()
+                       if p != file_prefix and now - listed >= self.list_cache_ttl]:
+            del self._list_cache[prefix]
+        self._list_cache[file_prefix] = (now, contents)
+        return contents
+    
+    def _load_etags(self):
+        """
+        Load the local file name -> S3 ETag map, empty if missing or unreadable
+        """
+        try:
+            with open(self.etag_path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def _save_etags(self, etags):
+        """
+        Atomically write the local file name -> S3 ETag map
+        """
+        tmp_path = self.etag_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(etags, f)
+        os.replace(tmp_path, self.etag_path)
+    
     def fetch_nexrad_data(self, radar_id, num_files=1):
         """
         Fetch NEXRAD radar data from AWS S3
@@ -43,59 +119,83 @@ class RadarDataService:
         list
             List of local file paths to downloaded radar data, or None if fetch fails
         """
-        s3 = boto3.client("s3")
+        s3 = self.s3
         bucket = "noaa-nexrad-level2"
         
         # Get current UTC date for constructing the prefix
-        today = datetime.datetime.utcnow()
-        file_prefix = f"{today.year}/{today.strftime('%m')}/{today.strftime('%d')}/{radar_id}/"
+        today = datetime.datetime.now(datetime.timezone.utc)
+        file_prefix = f"{today.strftime('%Y/%m/%d')}/{radar_id}/"
         
         try:
             # List objects in the S3 bucket with the specified prefix
-            response = s3.list_objects_v2(Bucket=bucket, Prefix=file_prefix)
+            contents = self._list_radar_objects(bucket, file_prefix)
             
-            if "Contents" in response:
+            if contents:
                 # Sort files by last modified time (most recent first)
                 sorted_files = sorted(
-                    response["Contents"],
+                    contents,
                     key=lambda x: x["LastModified"],
                     reverse=True
                 )[:num_files]
                 
-                local_files = []
-                # Download each file
-                for idx, item in enumerate(sorted_files):
-                    local_filename = os.path.join(self.data_folder, f"radar_data_{idx}")
+                local_files = [os.path.join(self.data_folder, f"radar_data_{idx}")
+                               for idx in range(len(sorted_files))]
+                
+                etags = self._load_etags()
+                
+                def download(item, local_filename):
+                    name = os.path.basename(local_filename)
+                    if etags.get(name) == item["ETag"] and os.path.isfile(local_filename):
+                        logger.debug("Unchanged: %s -> %s", item["Key"], local_filename)
+                        return
+                    # Forget the old ETag first so a failed download can't leave a stale match
+                    etags.pop(name, None)
                     s3.download_file(bucket, item["Key"], local_filename)
-                    print(f"Downloaded: {item['Key']} -> {local_filename}")
-                    local_files.append(local_filename)
+                    etags[name] = item["ETag"]
+                    logger.debug("Downloaded: %s -> %s", item["Key"], local_filename)
+                
+                # Download files concurrently; capped well below the client's connection pool
+                try:
+                    with ThreadPoolExecutor(max_workers=max(1, min(len(sorted_files), 8))) as executor:
+                        list(executor.map(download, sorted_files, local_files))
+                finally:
+                    self._save_etags(etags)
                 
                 return local_files
             else:
-                print(f"No radar data found for {radar_id} at {file_prefix}")
+                logger.warning("No radar data found for %s at %s", radar_id, file_prefix)
                 # Return existing files if available
-                existing_files = [os.path.join(self.data_folder, f) for f in os.listdir(self.data_folder) 
-                                 if os.path.isfile(os.path.join(self.data_folder, f)) 
-                                 and f.startswith("radar_data_")]
+                existing_files = self._existing_files()
                 if existing_files:
-                    print(f"Using {len(existing_files)} existing radar data files")
-                    return sorted(existing_files)[:num_files]
+                    logger.info("Using %d existing radar data files", len(existing_files))
+                    return existing_files[:num_files]
                 return None
                 
         except Exception as e:
-            print(f"Error fetching radar data: {e}")
+            logger.exception("Error fetching radar data: %s", e)
             # Return existing files as fallback
-            try:
-                existing_files = [os.path.join(self.data_folder, f) for f in os.listdir(self.data_folder) 
-                                if os.path.isfile(os.path.join(self.data_folder, f)) 
-                                and f.startswith("radar_data_")]
-                if existing_files:
-                    print(f"Using {len(existing_files)} existing radar data files as fallback")
-                    return sorted(existing_files)[:num_files]
-            except:
-                pass
+            existing_files = self._existing_files()
+            if existing_files:
+                logger.info("Using %d existing radar data files as fallback", len(existing_files))
+                return existing_files[:num_files]
             return None
-
+    
+    def _existing_files(self):
+        """
+        List previously downloaded radar files in the data folder
+        
+        Returns
+        -------
+        list
+            Sorted paths of radar_data_* files, empty if the folder can't be read
+        """
+        try:
+            # DirEntry.is_file() reuses the type from the directory read; no stat per file
+            with os.scandir(self.data_folder) as entries:
+                return sorted(entry.path for entry in entries
+                              if entry.name.startswith("radar_data_") and entry.is_file())
+        except OSError:
+            return []
 
 if __name__ == "__main__":
     # Test the radar data service
@@ -105,6 +205,7 @@ if __name__ == "__main__":
         print(f"Successfully downloaded {len(files)} radar data files")
         # Try loading the first file
         try:
+            import pyart
             radar = pyart.io.read(files[0])
             print(f"Successfully loaded radar data with {radar.nsweeps} sweeps")
         except Exception as e:
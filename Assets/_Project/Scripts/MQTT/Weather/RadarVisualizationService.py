@@ -2,30 +2,93 @@
 Radar Visualization Service Module
 Provides functionality to visualize NEXRAD radar data
 """
+import functools
+import math
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 import pandas as pd
-import pyart
-import matplotlib.pyplot as plt
-import matplotlib.patheffects as mpatheffects
-import cartopy
-import cartopy.crs as ccrs
-from netCDF4 import num2date
-import pytz
-from scipy.spatial import cKDTree
-from geopy.distance import geodesic
-from matplotlib import transforms
+import io
 import os
 import shutil
 import logging
-import boto3
 import datetime
+from zoneinfo import ZoneInfo
+
+# pyart, matplotlib, cartopy, netCDF4, scipy, boto3 and numba are imported
+# where they are used; each costs hundreds of milliseconds at import time and
+# station lookups or WeatherService users never need them
+
+
+def _sweep_thin_mask(order, indptr, indices, n):
+    """
+    Greedy thinning sweep over a CSR neighbor graph: each point still kept,
+    in priority order, removes all of its neighbors
+    """
+    mask = np.ones(n, dtype=np.bool_)
+    for i in order:
+        if mask[i]:
+            for k in range(indptr[i], indptr[i + 1]):
+                mask[indices[k]] = False
+    return mask
+
+
+@functools.lru_cache(maxsize=None)
+def _map_features(resolution):
+    """
+    Coastline and state/province boundary features at a Natural Earth scale,
+    shared by every frame so their geometries are loaded once
+    """
+    import cartopy.feature as cfeature
+
+    coastline = cfeature.COASTLINE.with_scale(resolution)
+    states_provinces = cfeature.NaturalEarthFeature(
+        category='cultural',
+        name='admin_1_states_provinces_lines',
+        scale=resolution,
+        facecolor='none')
+    return coastline, states_provinces
+
+
+# numba build of _sweep_thin_mask: False until first use, None once numba turns
+# out to be missing or fails on it
+_compiled_sweep_kernel = False
+
+
+def _compiled_sweep(order, indptr, indices, n):
+    """
+    Run _sweep_thin_mask compiled with numba (compiled on first use), or return
+    None when numba is not installed or cannot compile or run it
+    """
+    global _compiled_sweep_kernel
+    if _compiled_sweep_kernel is False:
+        try:
+            from numba import njit
+        except ImportError:
+            _compiled_sweep_kernel = None
+        else:
+            _compiled_sweep_kernel = njit(_sweep_thin_mask)
+    if _compiled_sweep_kernel is None:
+        return None
+    try:
+        return _compiled_sweep_kernel(order, indptr, indices, n)
+    except Exception as e:
+        # numba compiles on the first call; a failure there only costs the speedup
+        print(f"Compiled thinning sweep unavailable, using the interpreted one: {e}")
+        _compiled_sweep_kernel = None
+        return None
 
 
 class RadarVisualizationService:
     """
     Service for visualizing NEXRAD radar data
     """
-    def __init__(self, stations_csv="nexrad_stations.csv", image_path="radar.png"):
+    # Time zone of the scan timestamp printed for each frame
+    DISPLAY_TIMEZONE = 'US/Eastern'
+    # Natural Earth scale of the map features; 1:50m is plenty for a 40 km window
+    MAP_RESOLUTION = '50m'
+
+    def __init__(self, stations_csv="nexrad_stations.csv", image_path="radar.png", image_dpi=150):
         """
         Initialize the radar visualization service
         
@@ -35,22 +98,64 @@ class RadarVisualizationService:
             Path to CSV file containing NEXRAD station information
         image_path : str
             Default path to save radar visualization images
+        image_dpi : int, optional
+            Resolution of the rendered image; 150 dpi gives a 1500x1200 canvas
         """
-        self.stations = pd.read_csv(stations_csv)
+        # Station ICAO codes and coordinates (radians), shared by all instances
+        self._stn_icao, self._stn_lat, self._stn_lon = self._load_stations(os.path.abspath(stations_csv))
         self.image_path = image_path
+        self.image_dpi = image_dpi
         self.radar_data_dir = "radar_data"
+        self._dir_ready = False
         self.ensure_radar_data_dir()
         
-        # AWS credentials for NOAA NEXRAD data
-        self.aws_access_key_id = os.getenv('AWS_ACCESS_KEY_ID', '')
-        self.aws_secret_access_key = os.getenv('AWS_SECRET_ACCESS_KEY', '')
+        # S3 client for the public NOAA NEXRAD bucket, created on first fetch
+        self._s3 = None
+        # Newest listed keys per station: radar_id -> (day prefix, deque of objects)
+        self._key_tails = {}
+        # S3 (key, LastModified) behind each downloaded local file; a scan that
+        # is already on disk is not fetched again
+        self._local_sources = {}
+
+        # Figure and GeoAxes reused by every visualize_radar call
+        self._fig = None
+        self._ax = None
+        self._base_trans_data = None
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=4)
+    def _load_stations(path):
+        """
+        Load the NEXRAD station table once per path
+        
+        Parameters
+        ----------
+        path : str
+            Absolute path to the stations CSV
+            
+        Returns
+        -------
+        tuple of np.ndarray
+            (ICAO codes, latitudes in radians, longitudes in radians), read-only
+            since every instance shares them
+        """
+        df = pd.read_csv(path)
+        arrays = (df["ICAO"].to_numpy(),
+                  np.radians(df["LAT"].to_numpy(dtype=float)),
+                  np.radians(df["LON"].to_numpy(dtype=float)))
+        for array in arrays:
+            array.setflags(write=False)
+        return arrays
     
     def ensure_radar_data_dir(self):
         """
         Ensure that the radar data directory exists
         
-        Creates the directory if it doesn't exist
+        Creates the directory if it doesn't exist; after the first successful
+        check later calls return without touching the filesystem
         """
+        if self._dir_ready:
+            return
         if not os.path.exists(self.radar_data_dir):
             try:
                 os.makedirs(self.radar_data_dir)
@@ -60,6 +165,8 @@ class RadarVisualizationService:
                 self.create_placeholder_radar_files()
             except Exception as e:
                 print(f"Error creating directory {self.radar_data_dir}: {e}")
+                return
+        self._dir_ready = True
     
     def create_placeholder_radar_files(self):
         """
@@ -112,18 +219,17 @@ class RadarVisualizationService:
         tuple
             (ICAO code of nearest radar station, distance in km)
         """
-        min_dist = float("inf")
-        nearest_station = None
+        lat = math.radians(user_lat)
+        lon = math.radians(user_lon)
 
-        for _, row in self.stations.iterrows():
-            station_coords = (row["LAT"], row["LON"])
-            distance = geodesic(station_coords, (user_lat, user_lon)).km
+        # Haversine term to every station at once; it is monotonic in distance,
+        # so the nearest station is its argmin and only that one needs the arcsine
+        dlat = self._stn_lat - lat
+        dlon = self._stn_lon - lon
+        a = np.sin(dlat / 2) ** 2 + np.cos(self._stn_lat) * math.cos(lat) * np.sin(dlon / 2) ** 2
 
-            if distance < min_dist:
-                min_dist = distance
-                nearest_station = row["ICAO"]
-
-        return nearest_station, min_dist
+        i = int(np.argmin(a))
+        return self._stn_icao[i], 2 * 6371.0 * math.asin(math.sqrt(a[i]))
     
     @staticmethod
     def thin_points(xy, radius, sort_key=None):
@@ -144,22 +250,36 @@ class RadarVisualizationService:
         np.ndarray
             Boolean mask array, True indicates the point is retained
         """
-        mask = np.ones(xy.shape[0], dtype=bool)
+        from scipy.spatial import cKDTree
+
+        n = xy.shape[0]
 
         if sort_key is not None:
             sorted_indices = np.argsort(sort_key)[::-1]
         else:
-            sorted_indices = np.arange(len(xy))
+            sorted_indices = np.arange(n)
 
-        tree = cKDTree(xy)
+        # All pairs within radius in one tree query, as a symmetric CSR adjacency
+        pairs = cKDTree(xy).query_pairs(radius, output_type='ndarray')
+        src = np.concatenate([pairs[:, 0], pairs[:, 1]])
+        dst = np.concatenate([pairs[:, 1], pairs[:, 0]])
+        indices = dst[np.argsort(src, kind='stable')]
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=n), out=indptr[1:])
 
-        for sort_ind in sorted_indices:
-            if mask[sort_ind]:
-                for neighbor in tree.query_ball_point(xy[sort_ind], radius):
-                    if neighbor != sort_ind:
-                        mask[neighbor] = False
+        mask = _compiled_sweep(np.ascontiguousarray(sorted_indices, dtype=np.int64), indptr, indices, n)
+        if mask is not None:
+            return mask
 
-        return mask
+        # Interpreted sweep: plain lists index several times faster than NumPy scalars
+        indptr = indptr.tolist()
+        indices = indices.tolist()
+        mask = [True] * n
+        for i in sorted_indices.tolist():
+            if mask[i]:
+                for k in range(indptr[i], indptr[i + 1]):
+                    mask[indices[k]] = False
+        return np.array(mask, dtype=bool)
     
     @staticmethod
     def plot_range_rings(ax, user_lat, user_lon, radii, num_points=100, color='w', 
@@ -197,36 +317,102 @@ class RadarVisualizationService:
         angles = np.linspace(0, 2 * np.pi, num_points)
         cos_lat = np.cos(np.radians(user_lat))
 
-        # Draw each ring
-        for r in radii:
-            radius_deg = r / 110.574  # Latitude conversion: 1° ≈ 110.574 km
-            lats = user_lat + radius_deg * np.sin(angles)
-            lons = user_lon + (radius_deg * np.cos(angles)) / cos_lat
-            ax.plot(lons, lats, color=color, linestyle=linestyle)
+        # Draw all rings in one call: one column per radius
+        radius_deg = np.asarray(radii, dtype=float)[None, :] / 110.574  # Latitude conversion: 1° ≈ 110.574 km
+        lats = user_lat + radius_deg * np.sin(angles)[:, None]
+        lons = user_lon + (radius_deg * np.cos(angles)[:, None]) / cos_lat
+        ax.plot(lons, lats, color=color, linestyle=linestyle)
 
         # Add direction ticks and labels on the outermost ring
         if radii:
             max_radius = max(radii)
             max_radius_deg = max_radius / 110.574
 
-            for theta in range(0, 360, 90 if not show_minor_ticks else 5):
-                # Correct direction: 0° is due north, 90° is due east
-                theta_rad = np.radians(90 - theta + heading)
+            thetas = np.arange(0, 360, 90 if not show_minor_ticks else 5)
+            # Correct direction: 0° is due north, 90° is due east
+            theta_rad = np.radians(90 - thetas + heading)
 
-                # Calculate points on the outermost ring
-                lat_point = user_lat + max_radius_deg * np.sin(theta_rad)
-                lon_point = user_lon + (max_radius_deg * np.cos(theta_rad)) / cos_lat
+            # Calculate points on the outermost ring
+            lat_points = user_lat + max_radius_deg * np.sin(theta_rad)
+            lon_points = user_lon + (max_radius_deg * np.cos(theta_rad)) / cos_lat
 
-                # Label every 90° if show_labels is provided
-                if show_labels and theta % 90 == 0:
+            # Label every 90° if show_labels is provided
+            if show_labels:
+                major = thetas % 90 == 0
+                for theta, lon_point, lat_point in zip(thetas[major], lon_points[major], lat_points[major]):
                     label = show_labels[theta // 90]
                     ax.text(lon_point, lat_point, label, ha='center', va='top', 
                             fontsize=8, color=color)
     
+    def _get_canvas(self):
+        """
+        Return the cached figure and axes, cleared for a new frame
+        
+        Returns
+        -------
+        tuple
+            (figure, axes)
+        """
+        if self._fig is None:
+            from matplotlib.figure import Figure
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            import cartopy.crs as ccrs
+
+            # Create figure and axes with fixed size and transparent background.
+            # Frames are only ever written to PNG, so the figure gets its own Agg
+            # canvas; pyplot and the process-wide backend are left alone
+            self._fig = Figure(figsize=[10, 8], dpi=self.image_dpi, facecolor='none')
+            FigureCanvasAgg(self._fig)
+            self._ax = self._fig.add_subplot(projection=ccrs.PlateCarree())
+            self._base_trans_data = self._ax.transData
+        else:
+            self._ax.clear()
+            for text in list(self._fig.texts):
+                text.remove()
+            # Drop the heading rotation composed onto transData last frame
+            self._ax.transData = self._base_trans_data
+
+        ax = self._ax
+        ax.set_facecolor('none')  # Set axes background to transparent
+        ax.patch.set_alpha(0)     # Ensure patch is transparent
+        
+        # Remove all axes spines for full transparency
+        for spine in ax.spines.values():
+            spine.set_visible(False)
+        return self._fig, ax
+
+    @staticmethod
+    def _save_tight_png(fig, output, pad_inches=0.1):
+        """
+        Save the figure as a transparent PNG cropped to its tight bounding box
+        
+        Same result as savefig(bbox_inches='tight'), but that option draws the
+        whole figure once just to measure it before drawing again to print,
+        and every draw reprojects the reflectivity mesh. The tight box only
+        needs artist extents, which the canvas renderer provides without a draw.
+        
+        Parameters
+        ----------
+        fig : matplotlib.figure.Figure
+            Figure to save
+        output : str or file-like
+            Where to write the PNG
+        pad_inches : float, optional
+            Padding around the tight bounding box
+        """
+        bbox = fig.get_tightbbox(fig.canvas.get_renderer()).padded(pad_inches)
+        fig.savefig(output,
+                    format='png',
+                    bbox_inches=bbox,
+                    dpi=fig.dpi,
+                    transparent=True,  # Ensure transparency
+                    facecolor='none',  # Make figure background transparent
+                    edgecolor='none')  # No edge color
+
     def visualize_radar(self, radar_file, radar_id, user_lat, user_lon, 
                         min_lat=None, min_lon=None, max_lat=None, max_lon=None,
                         heading=0, tilt=0, gain=0, ground_speed=0, altitude=0, 
-                        destination="Unknown"):
+                        destination="Unknown", output=None):
         """
         Visualize radar data
         
@@ -254,13 +440,20 @@ class RadarVisualizationService:
             Altitude in feet
         destination : str, optional
             Destination name
+        output : str or file-like, optional
+            Where to write the PNG (defaults to self.image_path)
         """
+        import pyart
+        from matplotlib import transforms
+        from netCDF4 import num2date
+
         # Read radar data
         radar = pyart.io.read(radar_file)
-        lats = radar.gate_latitude
-        lons = radar.gate_longitude
 
         if (min_lat is None or min_lon is None or max_lat is None or max_lon is None):
+            # Gate coordinates are computed lazily by pyart; only touch them when needed
+            lats = radar.gate_latitude
+            lons = radar.gate_longitude
             min_lon = lons['data'].min()
             min_lat = lats['data'].min()
             max_lat = lats['data'].max()
@@ -270,10 +463,10 @@ class RadarVisualizationService:
               ' max_lat:', max_lat, ' max_lon:', max_lon)
               
         # Apply gain control to reflectivity data before plotting
-        if 'reflectivity' in radar.fields:
-            field_data = radar.fields['reflectivity']['data']
-            # Adjust reflectivity: higher gain amplifies weak returns
-            radar.fields['reflectivity']['data'] = field_data + gain
+        if gain and 'reflectivity' in radar.fields:
+            # Adjust reflectivity: higher gain amplifies weak returns. In place:
+            # the volume was just read and is not shared, so no copy is needed
+            radar.fields['reflectivity']['data'] += gain
             
         # Get time information
         sweep = 0
@@ -281,30 +474,17 @@ class RadarVisualizationService:
         time_at_start = num2date(radar.time['data'][index_at_start],
                                 radar.time['units'],
                                 only_use_cftime_datetimes=False)
-        auto_timezone = pytz.timezone('US/Eastern')
-        local_time = auto_timezone.fromutc(time_at_start)
+        # num2date returns naive UTC; ZoneInfo caches instances per key
+        local_time = time_at_start.replace(tzinfo=datetime.timezone.utc).astimezone(ZoneInfo(self.DISPLAY_TIMEZONE))
         fancy_date_string = local_time.strftime('%A %B %d at %I:%M %p %Z')
         print(fancy_date_string)
 
-        # Create figure and axes with fixed size and transparent background
-        fig = plt.figure(figsize=[10, 8], dpi=300, facecolor='none')
-        ax = plt.axes(projection=ccrs.PlateCarree())
-        ax.set_facecolor('none')  # Set axes background to transparent
-        ax.patch.set_alpha(0)     # Ensure patch is transparent
-        
-        # Remove all axes spines for full transparency
-        for spine in ax.spines.values():
-            spine.set_visible(False)
+        fig, ax = self._get_canvas()
 
         display = pyart.graph.RadarMapDisplay(radar)
         lat_0 = display.loc[0]
         lon_0 = display.loc[1]
 
-        # Cartopy projection (Mercator)
-        projection = cartopy.crs.Mercator(
-            central_longitude=lon_0,
-            min_latitude=min_lat, max_latitude=max_lat)
-        
         # Calculate beam ground offset based on tilt
         max_radius = 20  # Maximum plotting radius in km
         beam_offset_km = max_radius * np.tan(np.radians(tilt))
@@ -325,20 +505,25 @@ class RadarVisualizationService:
         # Plot radar data with transparent background
         cmap = pyart.graph.cm.NWSRef
         cmap.set_under('none')  # Make low values completely transparent
+        # No projection argument: pyart keeps the PlateCarree GeoAxes from _get_canvas
         display.plot_ppi_map(
             'reflectivity', 
             0,
-            resolution='10m',
+            fig=fig,  # otherwise pyart reaches for plt.gcf()
+            embellish=False,  # Map features are added below from a cached set
             colorbar_flag=False,
             title_flag=False,
-            projection=projection,
             min_lon=min_lon, max_lon=max_lon,
             min_lat=min_lat, max_lat=max_lat,
             vmin=-12, vmax=64,
             ax=ax,
             cmap=cmap,
+            raster=True,  # Keep the quadmesh a raster; text and markers stay crisp
             alpha=0.9  # Slightly reduce alpha to ensure transparency works
         )
+        coastline, states_provinces = _map_features(self.MAP_RESOLUTION)
+        ax.add_feature(coastline, edgecolor='black', facecolor='none')
+        ax.add_feature(states_provinces, edgecolor='gray')
 
         # Mark radar station location
         display.plot_point(lon_0, lat_0, label_text=radar_id, marker='o', color='white')
@@ -360,16 +545,11 @@ class RadarVisualizationService:
         display.plot_point(eff_lon, eff_lat, marker='*', color='yellow')
         
         # Save the image with transparent background
-        plt.savefig(self.image_path, 
-                    bbox_inches='tight', 
-                    dpi=300, 
-                    transparent=True,  # Ensure transparency 
-                    facecolor='none',  # Make figure background transparent
-                    edgecolor='none',  # No edge color
-                    pad_inches=0.1)
+        self._save_tight_png(fig, self.image_path if output is None else output, pad_inches=0.1)
     
     def generate_visualization(self, user_lat, user_lon, width_km=50, height_km=50,
-                              heading=0, tilt=0, gain=0, radar_file=None, radar_id=None):
+                              heading=0, tilt=0, gain=0, radar_file=None, radar_id=None,
+                              as_bytes=False):
         """
         Generate radar visualization based on user location
         
@@ -393,11 +573,15 @@ class RadarVisualizationService:
             Path to radar data file (if None, uses nearest station)
         radar_id : str, optional
             NEXRAD radar station ID (if None, finds nearest)
+        as_bytes : bool, optional
+            Render into memory and return the PNG bytes instead of writing
+            self.image_path
             
         Returns
         -------
-        str
-            Path to the generated image
+        str or bytes
+            Path to the generated image, or the PNG bytes if as_bytes is set
+            (None if rendering failed)
         """
         # Ensure the radar data directory exists
         self.ensure_radar_data_dir()
@@ -435,12 +619,13 @@ class RadarVisualizationService:
             radar_file = os.path.join(self.radar_data_dir, "radar_data_0")
 
         # Visualize the radar data
+        buf = io.BytesIO() if as_bytes else None
         try:
             self.visualize_radar(
                 radar_file, radar_id,
                 user_lat, user_lon,
                 min_lat=min_lat, min_lon=min_lon, max_lat=max_lat, max_lon=max_lon,
-                heading=heading, tilt=tilt, gain=gain
+                heading=heading, tilt=tilt, gain=gain, output=buf
             )
         except Exception as e:
             print(f"Error in primary visualization: {e}")
@@ -457,16 +642,24 @@ class RadarVisualizationService:
                     print(f"Warning: Fallback radar file {radar_file} does not exist. Using placeholder.")
                     self.create_placeholder_radar_files()
                     radar_file = os.path.join(self.radar_data_dir, "radar_data_1")
-                    
+                
+                if buf is not None:
+                    # Discard anything the failed attempt wrote
+                    buf.seek(0)
+                    buf.truncate()
                 self.visualize_radar(
                     radar_file, radar_id,
                     user_lat, user_lon,
                     min_lat=min_lat, min_lon=min_lon, max_lat=max_lat, max_lon=max_lon,
-                    heading=heading, tilt=tilt, gain=gain
+                    heading=heading, tilt=tilt, gain=gain, output=buf
                 )
             except Exception as e2:
                 print(f"Error in fallback visualization: {e2}")
-                
+                if buf is not None:
+                    return None
+        
+        if buf is not None:
+            return buf.getvalue()
         return self.image_path
 
     def fetch_nexrad_data(self, radar_id, num_files=5, folder=None):
@@ -487,14 +680,12 @@ class RadarVisualizationService:
         list
             List of paths to downloaded radar data files
         """
+        from boto3.s3.transfer import TransferConfig
+
         if folder is None:
             folder = self.radar_data_dir
             
-        s3 = boto3.client(
-            "s3",
-            aws_access_key_id=self.aws_access_key_id,
-            aws_secret_access_key=self.aws_secret_access_key
-        )
+        s3 = self._get_s3_client()
         bucket = "noaa-nexrad-level2"
         
         # Get today's date in UTC for the file prefix
@@ -503,32 +694,69 @@ class RadarVisualizationService:
         
         print(f"Looking for NEXRAD data with prefix: {file_prefix}")
         
-        # List objects in the bucket
-        response = s3.list_objects_v2(Bucket=bucket, Prefix=file_prefix)
-        if "Contents" in response:
-            # Sort files by last modified time (newest first)
-            sorted_files = sorted(
-                response["Contents"],
-                key=lambda x: x["LastModified"],
-                reverse=True
-            )[:num_files]
+        # NEXRAD keys embed the scan time, so listing order is chronological and
+        # the newest files are the tail. Keep a bounded tail per station and on
+        # the next fetch only list keys after the newest one already seen
+        cached_prefix, tail = self._key_tails.get(radar_id, (None, None))
+        if cached_prefix != file_prefix or tail.maxlen < num_files:
+            tail = deque(maxlen=num_files)
+        params = {"Bucket": bucket, "Prefix": file_prefix}
+        if tail:
+            params["StartAfter"] = tail[-1]["Key"]
+        for page in s3.get_paginator("list_objects_v2").paginate(**params):
+            tail.extend(page.get("Contents", ()))
+        self._key_tails[radar_id] = (file_prefix, tail)
+        
+        if tail:
+            # Newest first
+            sorted_files = list(reversed(tail))[:num_files]
             
-            local_files = []
-            if not os.path.exists(folder):
-                os.makedirs(folder)
-                
-            # Download files
-            for idx, item in enumerate(sorted_files):
-                local_filename = os.path.join(folder, f"radar_data_{idx}")
-                s3.download_file(bucket, item["Key"], local_filename)
+            os.makedirs(folder, exist_ok=True)
+            
+            local_files = [os.path.join(folder, f"radar_data_{idx}")
+                           for idx in range(len(sorted_files))]
+            # Volume scans are large enough for multipart, so each file is also split across threads
+            transfer_config = TransferConfig(max_concurrency=8, use_threads=True)
+            
+            def download(item, local_filename):
+                source = (item["Key"], item["LastModified"])
+                if self._local_sources.get(local_filename) == source and os.path.isfile(local_filename):
+                    return
+                # Forget the old source first so a failed download can't leave a stale match
+                self._local_sources.pop(local_filename, None)
+                s3.download_file(bucket, item["Key"], local_filename, Config=transfer_config)
+                self._local_sources[local_filename] = source
                 print(f"Downloaded: {item['Key']} -> {local_filename}")
-                local_files.append(local_filename)
+                
+            # Download files concurrently
+            with ThreadPoolExecutor(max_workers=max(1, len(sorted_files))) as executor:
+                list(executor.map(download, sorted_files, local_files))
                 
             return local_files
         else:
             print("No radar data found.")
             return None
 
+    def _get_s3_client(self):
+        """
+        Return the shared S3 client, creating it on first use
+        
+        Returns
+        -------
+        botocore.client.S3
+            Anonymous client; the NOAA bucket is public, so requests are not signed
+        """
+        if self._s3 is None:
+            import boto3
+            from botocore import UNSIGNED
+            from botocore.config import Config
+
+            self._s3 = boto3.client(
+                "s3",
+                config=Config(signature_version=UNSIGNED, max_pool_connections=16)
+            )
+        return self._s3
+
 
 if __name__ == "__main__":
     # Test the radar visualization service
@@ -475,6 +475,14 @@ public class WeatherDataReceiver : MonoBehaviour
         }
     }
     
+    /// <summary>
+    /// Check for the PNG file signature
+    /// </summary>
+    private static bool IsPng(byte[] data)
+    {
+        return data.Length >= 4 && data[0] == 0x89 && data[1] == 0x50 && data[2] == 0x4E && data[3] == 0x47;
+    }
+    
     /// <summary>
     /// Process radar image data from MQTT
     /// </summary>
@@ -485,11 +493,11 @@ public class WeatherDataReceiver : MonoBehaviour
         
         try
         {
-            // Convert payload (Base64) to a string
-            string base64String = Encoding.UTF8.GetString(imagePayload);
-            
-            // Decode Base64 string to get image bytes
-            byte[] imageBytes = Convert.FromBase64String(base64String);
+            // The payload is raw PNG bytes; older publishers sent it Base64-encoded,
+            // which a retained message on the broker may still carry
+            byte[] imageBytes = IsPng(imagePayload)
+                ? imagePayload
+                : Convert.FromBase64String(Encoding.UTF8.GetString(imagePayload));
             
             // Create a temporary texture and load the image bytes
             Texture2D texture = new Texture2D(2, 2);
@@ -2,10 +2,18 @@
 Weather Data Service Module
 Provides functionality to fetch or simulate weather data
 """
+import heapq
 import json
-import random
 import time
 import logging
+import numpy as np
+
+# orjson encodes several times faster than json; output is equivalent JSON
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 # Try to import NOAA SDK, if available
 try:
@@ -15,6 +23,25 @@ except ImportError:
     NOAA_AVAILABLE = False
     logging.warning("NOAA SDK not available. Will use simulated data instead.")
 
+# Fields an observation needs to be preferred over a newer, incomplete one
+REQUIRED_OBSERVATION_KEYS = frozenset(('windSpeed', 'temperature', 'visibility'))
+
+SKY_CONDITIONS = ("SKC", "CLR", "FEW", "SCT", "BKN", "OVC")
+
+# Ranges of the simulated wind speed, wind direction, ceiling, visibility,
+# temperature, dew point and elevation
+SIMULATED_LOWS = np.array([0, 0, 0, 1, -20, -30, 0], dtype=np.float64)
+SIMULATED_HIGHS = np.array([140, 360, 10000, 89999, 40, 30, 10], dtype=np.float64)
+SIMULATED_SPANS = SIMULATED_HIGHS - SIMULATED_LOWS
+
+
+def _dumps(data):
+    """Serialize a dict to a JSON string"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data).decode()
+    return json.dumps(data)
+
+
 class WeatherService:
     """
     Service for fetching or simulating weather data
@@ -32,6 +59,7 @@ class WeatherService:
         """
         self.latitude = latitude
         self.longitude = longitude
+        self._rng = np.random.default_rng()
 
     def simulate_weather_data(self, custom_lat=None, custom_lon=None):
         """
@@ -52,20 +80,25 @@ class WeatherService:
         lat = custom_lat if custom_lat is not None else self.latitude
         lon = custom_lon if custom_lon is not None else self.longitude
         
+        # One draw of eight uniforms: seven scaled into the field ranges, the last picks the sky condition
+        u = self._rng.random(8)
+        (wind_speed, wind_direction, ceiling, visibility,
+         temperature, dew_point, elevation) = (SIMULATED_LOWS + u[:7] * SIMULATED_SPANS).round(2).tolist()
+        
         data = {
-            "WindSpeed": round(random.uniform(0, 140), 2),
-            "WindDirection": round(random.uniform(0, 360), 2),
-            "Ceiling": round(random.uniform(0, 10000), 2),
-            "SkyCondition": random.choice(["SKC", "CLR", "FEW", "SCT", "BKN", "OVC"]),
-            "Visibility": round(random.uniform(1, 89999), 2),
-            "OutsideAirTemperature": round(random.uniform(-20, 40), 2),
-            "DewPoint": round(random.uniform(-30, 30), 2),
+            "WindSpeed": wind_speed,
+            "WindDirection": wind_direction,
+            "Ceiling": ceiling,
+            "SkyCondition": SKY_CONDITIONS[int(u[7] * len(SKY_CONDITIONS))],
+            "Visibility": visibility,
+            "OutsideAirTemperature": temperature,
+            "DewPoint": dew_point,
             "Latitude": lat,
             "Longitude": lon,
-            "Elevation": round(random.uniform(0, 10), 2),
+            "Elevation": elevation,
             "Time": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime())
         }
-        return json.dumps(data)
+        return _dumps(data)
 
     def fetch_real_weather_data(self, custom_lat=None, custom_lon=None):
         """
@@ -98,13 +131,13 @@ class WeatherService:
                 logging.warning("No observations found. Using simulated data.")
                 return self.simulate_weather_data(custom_lat=lat, custom_lon=lon)
                 
-            # Sort observations by timestamp in descending order
-            obs_sorted = sorted(obs, key=lambda x: x.get('timestamp', ''), reverse=True)
+            # Five most recent observations by timestamp; no need to sort the rest
+            recent_obs = heapq.nlargest(5, obs, key=lambda x: x.get('timestamp', ''))
             
             # Take the most recent useful observation
-            newest_ob = obs_sorted[0]  # Default to first
-            for ob in obs_sorted[:5]:  # Check first 5 for complete data
-                if all(key in ob for key in ['windSpeed', 'temperature', 'visibility']):
+            newest_ob = recent_obs[0]  # Default to first
+            for ob in recent_obs:  # Check for complete data
+                if REQUIRED_OBSERVATION_KEYS.issubset(ob):
                     newest_ob = ob
                     break
                     
@@ -123,7 +156,7 @@ class WeatherService:
                 "Elevation": newest_ob.get('elevation', {}).get('value', 'N/A'),
                 "Time": newest_ob.get('timestamp', 'N/A')
             }
-            return json.dumps(data)
+            return _dumps(data)
             
         except Exception as e:
             logging.error(f"Error fetching observations: {e}")
@@ -3,9 +3,43 @@ MqttWeather Package
 A package for weather data acquisition and visualization using MQTT
 """
 
+import importlib
+import sys
+import types
+
 from .WeatherService import WeatherService
-from .RadarDataService import RadarDataService
-from .RadarVisualizationService import RadarVisualizationService
-from .MqttHandler import MqttHandler
 
-__all__ = ['WeatherService', 'RadarDataService', 'RadarVisualizationService', 'MqttHandler']
\ No newline at end of file
+# Services pulling in boto3/pyart/paho are only imported when first referenced.
+# Each class shares its name with its submodule, and importing a submodule
+# binds the module object onto the package under that name; a plain PEP 562
+# __getattr__ is then never consulted. Properties on the package's module type
+# take precedence over that binding, so the name always resolves to the class.
+_LAZY_CLASSES = ('RadarDataService', 'RadarVisualizationService', 'MqttHandler')
+
+__all__ = ['WeatherService', 'RadarDataService', 'RadarVisualizationService', 'MqttHandler']
+
+
+def _lazy_class(name):
+    def load(package):
+        return getattr(importlib.import_module('.' + name, package.__name__), name)
+
+    def ignore_submodule(package, value):
+        # The import system stores the submodule here; the class is kept instead
+        pass
+
+    return property(load, ignore_submodule)
+
+
+class _Package(types.ModuleType):
+    pass
+
+
+for _name in _LAZY_CLASSES:
+    setattr(_Package, _name, _lazy_class(_name))
+del _name
+
+sys.modules[__name__].__class__ = _Package
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY_CLASSES))
@@ -4,27 +4,13 @@ Main entry point for the MqttWeather application
 import argparse
 import sys
 import os
-from MqttWeather import MqttHandler
-from MqttWeather import (
-    WeatherService,
-    RadarDataService,
-    RadarVisualizationService
-)
 
+# Services are imported inside the command that uses them: each pulls in its
+# own heavy dependencies (paho, boto3, pyart, cartopy) and a run only needs one
 
-def main():
-    #python -m MqttWeather.main mqtt
-    """
-    Main entry point for the MqttWeather application
-    
-    Parses command line arguments and starts the appropriate service
-    """
-    parser = argparse.ArgumentParser(description="MqttWeather - NEXRAD Weather Data and Visualization with MQTT")
-    
-    # Add subparsers for different commands
-    subparsers = parser.add_subparsers(dest="command", help="Command to run")
-    
-    # MQTT service command
+
+def _add_mqtt_parser(subparsers):
+    """MQTT service command"""
     mqtt_parser = subparsers.add_parser("mqtt", help="Start MQTT service")
     mqtt_parser.add_argument("--broker", type=str, default="agist.org", help="MQTT broker address")
     mqtt_parser.add_argument("--port", type=int, default=1883, help="MQTT broker port")
@@ -33,14 +19,18 @@ def main():
     mqtt_parser.add_argument("--weather-topic", type=str, default="NOAAWeatherData", help="MQTT topic for weather data")
     mqtt_parser.add_argument("--coordinates-topic", type=str, default="NOAAWeatherCoordinates", help="MQTT topic for coordinates")
     mqtt_parser.add_argument("--radar-topic", type=str, default="NEXRADImage", help="MQTT topic for radar images")
-    
-    # Weather service command
+
+
+def _add_weather_parser(subparsers):
+    """Weather service command"""
     weather_parser = subparsers.add_parser("weather", help="Get weather data")
     weather_parser.add_argument("--lat", type=float, default=39.7083, help="Latitude")
     weather_parser.add_argument("--lon", type=float, default=-75.1179, help="Longitude")
     weather_parser.add_argument("--simulated", action="store_true", help="Use simulated data instead of real data")
-    
-    # Radar visualization command
+
+
+def _add_radar_parser(subparsers):
+    """Radar visualization command"""
     radar_parser = subparsers.add_parser("radar", help="Generate radar visualization")
     radar_parser.add_argument("--lat", type=float, default=39.7083, help="Latitude")
     radar_parser.add_argument("--lon", type=float, default=-75.1179, help="Longitude")
@@ -50,12 +40,42 @@ def main():
     radar_parser.add_argument("--width", type=float, default=50, help="Width of the map in kilometers")
     radar_parser.add_argument("--height", type=float, default=50, help="Height of the map in kilometers")
     radar_parser.add_argument("--output", type=str, default="radar.png", help="Output file path")
+
+
+# Subparser builders by command name, in help order
+COMMAND_PARSERS = {
+    "mqtt": _add_mqtt_parser,
+    "weather": _add_weather_parser,
+    "radar": _add_radar_parser,
+}
+
+
+def main():
+    #python -m MqttWeather.main mqtt
+    """
+    Main entry point for the MqttWeather application
+    
+    Parses command line arguments and starts the appropriate service
+    """
+    parser = argparse.ArgumentParser(description="MqttWeather - NEXRAD Weather Data and Visualization with MQTT")
+    
+    # Add subparsers for different commands; when argv names one, only that
+    # subparser is built
+    subparsers = parser.add_subparsers(dest="command", help="Command to run")
+    command = sys.argv[1] if len(sys.argv) > 1 else None
+    if command in COMMAND_PARSERS:
+        COMMAND_PARSERS[command](subparsers)
+    else:
+        for add_parser in COMMAND_PARSERS.values():
+            add_parser(subparsers)
     
     # Parse arguments
     args = parser.parse_args()
     
     # Execute command
     if args.command == "mqtt":
+        from MqttWeather import MqttHandler
+        
         # Start MQTT service
         handler = MqttHandler(
             broker=args.broker,
@@ -73,6 +93,8 @@ def main():
             print("Ctrl+C pressed. Terminating...")
             
     elif args.command == "weather":
+        from MqttWeather import WeatherService
+        
         # Get weather data
         service = WeatherService(latitude=args.lat, longitude=args.lon)
         if args.simulated:
@@ -84,6 +106,8 @@ def main():
         print(data)
         
     elif args.command == "radar":
+        from MqttWeather import RadarVisualizationService
+        
         # Generate radar visualization
         service = RadarVisualizationService(image_path=args.output)
         image_path = service.generate_visualization(
@@ -138,15 +138,23 @@ namespace WeatherRadar
         }
 
         /// <summary>
-        /// Process Base64-encoded radar image from MQTT
+        /// Check for the PNG file signature
+        /// </summary>
+        private static bool IsPng(byte[] data)
+        {
+            return data.Length >= 4 && data[0] == 0x89 && data[1] == 0x50 && data[2] == 0x4E && data[3] == 0x47;
+        }
+
+        /// <summary>
+        /// Process raw PNG radar image from MQTT (Base64 from older publishers is still accepted)
         /// </summary>
         private void ProcessRadarImage(byte[] payload)
         {
             try
             {
-                // Decode Base64 string to bytes
-                string base64String = Encoding.UTF8.GetString(payload);
-                byte[] imageBytes = Convert.FromBase64String(base64String);
+                byte[] imageBytes = IsPng(payload)
+                    ? payload
+                    : Convert.FromBase64String(Encoding.UTF8.GetString(payload));
                 lastImageData = imageBytes;
 
                 // Load image into texture
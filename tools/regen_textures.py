@@ -0,0 +1,23 @@
+"""Regenerate the static TCAS texture PNGs in Assets/Resources/Textures.
+
+The textures are committed as assets and loaded by Unity from Resources, so
+nothing at runtime draws them; run this only after changing a Draw*.py script:
+
+    python tools/regen_textures.py
+"""
+import os
+import subprocess
+import sys
+
+TEXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Assets', 'Resources', 'Textures')
+SCRIPTS = ['Draw2NMRadiusCircle.py', 'DrawTCASCenter.py', 'DrawTraffic.py']
+
+def main():
+    textures_dir = os.path.normpath(TEXTURES_DIR)
+    for script in SCRIPTS:
+        print('Running', script)
+        # The scripts write their PNGs relative to the working directory
+        subprocess.run([sys.executable, script], cwd=textures_dir, check=True)
+
+if __name__ == '__main__':
+    main()